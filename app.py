@@ -1,26 +1,411 @@
+import traceback
 import streamlit as st
-import pandas as pd
 from pathlib import Path
-import shutil
-import tempfile
-from generator_core import run_generator
+from fnmatch import fnmatchcase
+
+# Naming convention options and the generator flag each one switches on (Standard sets none)
+NAMING_STYLES = {
+    "Standard": None,
+    "CORP": "require_corp",
+    "CORP RecP": "require_recp",
+    "CORP Dedicated Services": "require_corp_dedicated",
+    "CORP IT": "require_corp_it",
+    "Dedicated Services": "require_dedicated",
+    "DAK (Business Services)": "special_dak",
+    "HR": "special_hr",
+    "IT": "special_it",
+    "Medical": "special_medical",
+}
+
+# Select options, written to the output exactly as shown
+BUSINESS_CRITICALITY_OPTIONS = ("", "1 - most critical", "2 - somewhat critical", "3 - less critical", "4 - not critical")
+COMMITMENT_PRIORITIES = ("P1", "P2", "P3", "P4", "P1-P2", "P3-P4", "P1-P4")
+
+# Country labels shown in the UI whose generator key drops the division prefix
+BACKEND_COUNTRY_KEYS = {"DS CY": "CY", "DS RO": "RO", "DS TR": "TR"}
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def parse_uploaded_file(uploaded_file, use_lvl2):
+    """Parse one uploaded ALL_Service_Offering workbook into DataFrames.
+
+    Cached per file on its contents and the lvl2 switch only, so changing
+    settings - or adding/replacing another upload - reuses the sheets already
+    parsed instead of reading the Excel files again. Held as a resource, so a
+    cache hit hands back the same DataFrames without copying them - the
+    generator only reads them.
+    """
+    from generator_core import read_source_workbook
+
+    return read_source_workbook(uploaded_file, use_lvl2)
+
+def parse_uploaded_files(uploaded_files, use_lvl2):
+    """Parsed source workbooks by file stem, for the uploads matching the source file pattern"""
+    from generator_core import SOURCE_FILE_PATTERN, read_in_parallel
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+    source_files = [f for f in uploaded_files if fnmatchcase(f.name, SOURCE_FILE_PATTERN)]
+    for uploaded_file in source_files:
+        # The cache key includes the read position, so always hash (and read) from the start
+        uploaded_file.seek(0)
+
+    # Files are parsed on worker threads - hand them this run's context so the cache works there too
+    ctx = get_script_run_ctx()
+
+    def parse(uploaded_file):
+        add_script_run_ctx(ctx=ctx)
+        return parse_uploaded_file(uploaded_file, use_lvl2)
+
+    frames = read_in_parallel(parse, source_files)
+    return {Path(f.name).stem: file_frames for f, file_frames in zip(source_files, frames)}
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def generate_offerings(uploaded_files, generator_kwargs):
+    """Run the generator on the uploaded files and return (file name, file bytes).
+
+    Cached on the uploaded file contents and all generator settings, so clicking
+    Generate again with unchanged inputs returns the previous result instantly.
+    """
+    # Imported here so pandas/openpyxl are only loaded once generation is requested
+    from generator_core import run_generator
+
+    source_frames = parse_uploaded_files(uploaded_files, generator_kwargs["use_lvl2"])
+
+    # Without out_dir the generator returns the workbook as an in-memory (named) BytesIO
+    result_file = run_generator(**generator_kwargs, src_dir=None, out_dir=None, source_frames=source_frames)
+    return result_file.name, result_file.getvalue()
 
 def get_plural_form_preview(word):
-    """Get plural form for preview"""
-    plural_map = {
-        "Laptop": "Laptops", "Desktop": "Desktops", "Docking station": "Docking stations",
-        "Printer": "Printers", "Barcode printer": "Barcode printers", "Barcode scanner": "Barcode scanners",
-        "Display": "Displays", "Deskphone": "Deskphones", "Smartphone": "Smartphones",
-        "Mouse": "Mouses", "Keyboard": "Keyboards", "Headset": "Headsets", "Tablet": "Tablets",
-        "Audio equipment": "Audio equipment", "Video surveillance": "Video surveillance",
-        "UPS": "UPS", "External webcam": "External webcams", "Projector": "Projectors",
-        "External storage device": "External storage devices", "Microphone": "Microphones",
-        "Other hardware": "Other hardware", "Server": "Servers", "Router": "Routers",
-        "Switch": "Switches", "Firewall": "Firewalls", "Access point": "Access points",
-        "Scanner": "Scanners", "Webcam": "Webcams", "Camera": "Cameras", "Monitor": "Monitors",
-        "Speaker": "Speakers", "Cable": "Cables", "Adapter": "Adapters"
-    }
-    return plural_map.get(word, word)
+    """Get plural form for preview - from the generator's own map, so the two cannot drift apart"""
+    # The settings (and this preview) are only shown after an upload, when generation is next anyway
+    from generator_core import PLURAL_MAP
+
+    return PLURAL_MAP.get(word, word)
+
+def parse_lines(text):
+    """Non-empty, stripped lines of a text area"""
+    return [line for line in map(str.strip, text.splitlines()) if line]
+
+def parse_apps(text):
+    """Application names from a text area - one per line or comma/semicolon-separated, like the generator splits them"""
+    # Imported here like the generator itself - the settings tabs are only built after an upload
+    from generator_core import APP_SEPARATOR_RE
+
+    return [app for app in map(str.strip, APP_SEPARATOR_RE.split(text)) if app]
+
+def format_commitment_lines(commitments, prefix, sr_or_im):
+    """Service Commitments text for the filled commitment rows - an SR's RSL row also gets its OLA line"""
+    lines = []
+    for commitment in commitments:
+        if commitment["Schedule"] and commitment["Time"]:
+            details = f"{commitment['Type']} {commitment['Schedule']} {commitment['Priority']} {commitment['Time']}"
+            lines.append(f"[{prefix}] SLA {sr_or_im} {details}")
+            if sr_or_im == "SR" and commitment["Type"] == "RSL":
+                lines.append(f"[{prefix}] OLA {sr_or_im} {details}")
+    return "\n".join(lines)
+
+def schedule_periods_editor(key):
+    """Days/Hours periods of one custom schedule, edited as one table - returns the schedule suffix"""
+    periods = st.data_editor(
+        [{"Days": "", "Hours": ""} for _ in range(2)],
+        num_rows="dynamic",
+        hide_index=True,
+        width="stretch",
+        column_config={
+            "Days": st.column_config.TextColumn("Days", help="e.g. Mon-Thu or Fri or Sat-Sun", default=""),
+            "Hours": st.column_config.TextColumn("Hours", help="e.g. 9-17", default=""),
+        },
+        key=key,
+    )
+    return " ".join(f"{p['Days']} {p['Hours']}" for p in periods if p["Days"] and p["Hours"])
+
+@st.fragment
+def schedule_settings():
+    """Schedule tab - runs as a fragment, so editing schedules only reruns this tab"""
+    st.subheader("Schedule Settings")
+    
+    schedule_type = st.checkbox("Custom schedule per period")
+    create_multiple_schedules = st.checkbox("Create multiple schedules", help="Generate the same offerings with different schedules")
+    
+    schedule_suffixes = []
+    
+    if not schedule_type and create_multiple_schedules:
+        schedule_simple = st.text_area(
+            "Schedules", 
+            value="", 
+            placeholder="Mon-Fri 9-17\nMon-Fri 8-16\nMon-Sun 24/7",
+            height=150
+        )
+        schedule_suffixes = parse_lines(schedule_simple)
+    elif schedule_type and not create_multiple_schedules:
+        schedule_suffix = schedule_periods_editor("schedule_periods")
+        schedule_suffixes = [schedule_suffix] if schedule_suffix else []
+    elif schedule_type and create_multiple_schedules:
+        num_schedules = st.number_input("Number of schedules", min_value=1, max_value=5, value=2)
+        schedule_suffixes = []
+        
+        for sched_idx in range(num_schedules):
+            st.markdown(f"### Schedule {sched_idx + 1}")
+            schedule_suffix = schedule_periods_editor(f"schedule_periods_{sched_idx}")
+            if schedule_suffix:
+                schedule_suffixes.append(schedule_suffix)
+    else:
+        schedule_simple = st.text_input("Schedule", value="", placeholder="e.g. Mon-Fri 9-17")
+        schedule_suffixes = [schedule_simple] if schedule_simple else []
+    
+    st.markdown("---")
+    
+    use_per_country_schedules = st.checkbox("Use different schedules per country", help="Define specific schedules for different countries")
+    schedule_settings_per_country = {}
+    
+    if use_per_country_schedules:
+        st.markdown("Schedule Settings per Country")
+        available_countries = ["HS PL", "DS PL", "DE", "MD", "UA", "DS CY", "DS RO", "DS TR"]
+        country_tabs = st.tabs(available_countries, key="schedule_country_tab", on_change="rerun")
+        
+        # Only the open country tab is rendered; the texts of the others are kept in session_state
+        country_schedule_texts = st.session_state.setdefault("country_schedule_texts", {})
+        for country, country_tab in zip(available_countries, country_tabs):
+            if country_tab.open:
+                with country_tab:
+                    st.markdown(f"{country} Schedules")
+                    
+                    country_schedule_texts[country] = st.text_area(
+                        f"Schedules for {country}",
+                        value=country_schedule_texts.get(country, ""),
+                        placeholder="Mon-Fri 9-17\nMon-Fri 8-16\nMon-Sun 24/7",
+                        height=150,
+                        key=f"schedule_{country.replace(' ', '_')}"
+                    )
+            
+            country_schedules = parse_lines(country_schedule_texts.get(country, ""))
+            if country_schedules:
+                schedule_settings_per_country[BACKEND_COUNTRY_KEYS.get(country, country)] = country_schedules
+    
+    st.markdown("### SLA")
+    col_rsp, col_rsl = st.columns(2)
+    with col_rsp:
+        rsp_duration = st.text_input("RSP Duration", value="")
+    with col_rsl:
+        rsl_duration = st.text_input("RSL Duration", value="")
+    
+    return schedule_suffixes, schedule_settings_per_country, rsp_duration, rsl_duration
+
+@st.fragment
+def new_parent_settings():
+    """New Parent Offering tab - runs as a fragment, adding or removing pairs only reruns this tab"""
+    st.subheader("Direct Parent Offering Selection")
+
+    use_new_parent = st.checkbox(
+        "Use NEW specific parent offering (instead of parent keyword search in Excel)",
+        help="When checked, you can enter a completely new Parent Offering and Parent name - not inclided in the file yet"
+    )
+
+    if use_new_parent:
+        st.info("📝 Enter the exact Parent Offering and Parent values to use")
+        if 'parent_offerings' not in st.session_state:
+            st.session_state.parent_offerings = [{"offering": "", "parent": ""}]
+    
+        st.markdown("### Parent Offering")
+
+        for i, pair in enumerate(st.session_state.parent_offerings):
+            col1, col2, col3 = st.columns([2, 2, 1])
+    
+            with col1:
+                pair["offering"] = st.text_input(
+                    "New Parent Offering",
+                    value=pair["offering"],
+                    placeholder="e.g., [Parent HS PL IT] Software assistance",
+                    key=f"offering_{i}"
+                )
+    
+            with col2:
+                pair["parent"] = st.text_input(
+                    "New Parent",
+                    value=pair["parent"],
+                    placeholder="e.g., PL Software Support",
+                    key=f"parent_{i}"
+                )
+    
+            with col3:
+                if len(st.session_state.parent_offerings) > 1:
+                    if st.button("➖", key=f"remove_{i}", help="Remove this pair"):
+                        st.session_state.parent_offerings.pop(i)
+                        st.rerun()
+    
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("➕ Add Parent Offering", use_container_width=True):
+                st.session_state.parent_offerings.append({"offering": "", "parent": ""})
+                st.rerun()
+    
+        with col2:
+            if len(st.session_state.parent_offerings) > 1:
+                if st.button("➖ Remove Last", use_container_width=True):
+                    st.session_state.parent_offerings.pop()
+                    st.rerun()
+    
+        new_parent_offerings = "\n".join([pair["offering"] for pair in st.session_state.parent_offerings if pair["offering"]])
+        new_parents = "\n".join([pair["parent"] for pair in st.session_state.parent_offerings if pair["parent"]])
+
+        if new_parent_offerings and new_parents:
+            st.success("✅ **Preview of Parent Offering pairs:**")
+            for i, pair in enumerate(st.session_state.parent_offerings):
+                if pair["offering"] and pair["parent"]:
+                    st.write(f"{i+1}. Parent Offering: `{pair['offering']}` → New Parent: `{pair['parent']}`")
+    else:
+        new_parent_offerings = ""
+        new_parents = ""
+        if 'parent_offerings' in st.session_state:
+            del st.session_state.parent_offerings
+    
+    return use_new_parent, new_parent_offerings, new_parents
+
+@st.fragment
+def commitment_settings(sr_or_im):
+    """Service Commitments tab - runs as a fragment, so editing commitment lines only reruns this tab"""
+    st.subheader("Service Commitments")
+
+    use_custom_commitments = st.checkbox("Define custom Service Commitments", help="If unchecked, commitments will be copied from the source files")
+
+    if use_custom_commitments:
+        commitment_country = st.selectbox("Country", ["CY", "DE", "MD", "PL", "RO", "TR", "UA"])
+    
+        st.markdown("Service Commitments Configuration")
+        # The line prefix is the same for every commitment line, so resolve it once
+        if st.session_state.get('use_custom_depend_on', False) and st.session_state.get('depend_on_prefix'):
+            prefix_to_use = st.session_state.get('depend_on_prefix')
+            if prefix_to_use == "Global":
+                if st.session_state.get('special_it', False):
+                    prefix_to_use = "Global"
+                else:
+                    prefix_to_use = "Global Prod" if st.session_state.get('global_prod', False) else "Global"
+            else:
+                if st.session_state.get('special_it', False):
+                    prefix_to_use = st.session_state.get('depend_on_prefix')
+                else:
+                    if st.session_state.get('global_prod', False):
+                        prefix_to_use = f"{st.session_state.get('depend_on_prefix')} Prod"
+                    else:
+                        prefix_to_use = st.session_state.get('depend_on_prefix')
+        else:
+            prefix_to_use = commitment_country
+    
+        commitments = st.data_editor(
+            [{"Type": "RSP", "Priority": "P1", "Schedule": "", "Time": ""} for _ in range(2)],
+            num_rows="dynamic",
+            hide_index=True,
+            width="stretch",
+            column_config={
+                "Type": st.column_config.SelectboxColumn("Type", options=["RSP", "RSL"], default="RSP", required=True),
+                "Priority": st.column_config.SelectboxColumn("Priority", options=COMMITMENT_PRIORITIES, default="P1", required=True),
+                "Schedule": st.column_config.TextColumn("Schedule", help="e.g. Mon-Fri 6-21", default=""),
+                "Time": st.column_config.TextColumn("Time", help="e.g. 2h, 1d", default=""),
+            },
+            key="commitments",
+        )
+    
+        custom_commitments_str = format_commitment_lines(commitments, prefix_to_use, sr_or_im)
+        if custom_commitments_str:
+            st.markdown("### Preview")
+            st.code(custom_commitments_str)
+    else:
+        custom_commitments_str = ""
+        commitment_country = None
+    
+    return use_custom_commitments, custom_commitments_str, commitment_country
+
+@st.fragment
+def group_settings():
+    """Groups tab - runs as a fragment, so editing support groups only reruns this tab"""
+    st.subheader("Support Groups")
+    use_per_country_groups = st.checkbox("Use different support groups per country", value=False)
+
+    if not use_per_country_groups:
+        st.markdown("#### Global Support Groups")
+        support_group = st.text_input("Support Group", value="", help="Same support group for all countries")
+        managed_by_group = st.text_input(
+            "Managed by Group", 
+            value="",
+            help="Optional - if empty, Support Group value will be copied"
+        )
+        # The same groups for every country - only filled in when a Support Group is given
+        all_countries = ["HS PL", "DS PL", "DE", "UA", "MD", "CY", "RO", "TR"] if support_group else []
+        support_groups_per_country = dict.fromkeys(all_countries, support_group)
+        managed_by_groups_per_country = dict.fromkeys(all_countries, managed_by_group or support_group)
+    else:
+        st.markdown("Support Groups by Country")
+        st.info("Select countries to configure.")
+        countries = ["HS PL", "DS PL", "DE", "UA", "MD", "DS CY", "DS RO", "DS TR"]
+        support_groups_per_country = {}
+        managed_by_groups_per_country = {}
+        cols = st.columns(2)
+    
+        for i, country in enumerate(countries):
+            col_idx = i % 2
+            with cols[col_idx]:
+                country_enabled = st.checkbox(f"Configure {country}", key=f"enable_{country}")
+    
+                if country_enabled:
+                    if country == "DE":
+                        num_de_groups = st.number_input(
+                            f"Number of Support Groups for DE", 
+                            min_value=1, 
+                            max_value=5, 
+                            value=1, 
+                            key=f"num_groups_DE",
+                            help="DE can have multiple support groups for the same offerings"
+                        )
+    
+                        de_support_groups = []
+                        de_managed_groups = []
+    
+                        for group_idx in range(num_de_groups):
+                            st.markdown(f"**DE Support Group {group_idx + 1}**")
+                            de_support_group = st.text_input(
+                                f"Support Group {group_idx + 1}",
+                                value="",
+                                key=f"support_DE_{group_idx}",
+                                placeholder=f"e.g., DE IT Support Team {group_idx + 1}"
+                            )
+                            de_managed_group = st.text_input(
+                                f"Managed by Group {group_idx + 1}",
+                                value="",
+                                key=f"managed_DE_{group_idx}",
+                                placeholder=f"Optional - uses Support Group if empty",
+                                help="If empty, will use the Support Group value"
+                            )
+    
+                            if de_support_group:
+                                de_support_groups.append(de_support_group)
+                                de_managed_groups.append(de_managed_group if de_managed_group else de_support_group)
+    
+                        support_groups_per_country[country] = "\n".join(de_support_groups) if de_support_groups else ""
+                        managed_by_groups_per_country[country] = "\n".join(de_managed_groups) if de_managed_groups else ""
+                    else:
+                        backend_key = BACKEND_COUNTRY_KEYS.get(country, country)
+    
+                        support_groups_per_country[backend_key] = st.text_input(
+                            f"Support Group",
+                            value="",
+                            key=f"support_{country}",
+                            placeholder=f"e.g., {country} IT Support"
+                        )
+                        managed_by_groups_per_country[backend_key] = st.text_input(
+                            f"Managed by Group",
+                            value="",
+                            key=f"managed_{country}",
+                            placeholder=f"Optional - uses Support Group if empty",
+                            help="If empty, will use the Support Group value"
+                        )
+                else:
+                    backend_key = BACKEND_COUNTRY_KEYS.get(country, country)
+    
+                    support_groups_per_country[backend_key] = ""
+                    managed_by_groups_per_country[backend_key] = ""
+        support_group = ""
+        managed_by_group = ""
+    
+    return support_group, managed_by_group, support_groups_per_country, managed_by_groups_per_country
 
 st.set_page_config(page_title="Service Offerings Generator", layout="wide")
 
@@ -39,749 +424,349 @@ with col1:
     )
     
     if uploaded_files:
-        st.success(f"✅ Uploaded {len(uploaded_files)} file(s)")
-        for file in uploaded_files:
-            st.text(f"• {file.name}")
+        # UploadedFile.size is upload metadata - no need to materialize the buffer just to show it
+        file_sizes = [file.size for file in uploaded_files]
+        st.success(f"✅ Uploaded {len(uploaded_files)} file(s) ({sum(file_sizes):,} bytes)")
+        # One element for the whole list instead of one per file
+        st.text("\n".join(f"• {file.name} ({size:,} bytes)" for file, size in zip(uploaded_files, file_sizes)))
 
 with col2:
     st.header("⚙️ Configuration")
     
-    tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs(["Basic", "New Parent Offering", "Schedule", "Service Commitments", "Groups", "Naming", "Other settings"])
+    # Configuration widgets are only built once there is something to configure
+    if not uploaded_files:
+        st.info("Upload the ALL_Service_Offering files to configure the generation")
+    else:
+        tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs(["Basic", "New Parent Offering", "Schedule", "Service Commitments", "Groups", "Naming", "Other settings"])
     
-    with tab1:
-        st.subheader("Basic Settings")
+        with tab1:
+            st.subheader("Basic Settings")
         
-        keywords_parent = st.text_area(
-            "Keywords in Parent Offering",
-            value="",
-            placeholder="Enter keywords (one per line for OR, comma separated for AND)",
-            help="Filter by Parent Offering column in Excel"
-        )
+            keywords_parent = st.text_area(
+                "Keywords in Parent Offering",
+                value="",
+                placeholder="Enter keywords (one per line for OR, comma separated for AND)",
+                help="Filter by Parent Offering column in Excel"
+            )
         
-        keywords_child = st.text_area(
-            "Keywords in Name (Child Service Offering lvl 1)",
-            value="",
-            placeholder="Enter keywords (one per line for OR, comma-separated for AND)",
-            help="Filter by Child Service Offering Name column in Excel"
-        )
+            keywords_child = st.text_area(
+                "Keywords in Name (Child Service Offering lvl 1)",
+                value="",
+                placeholder="Enter keywords (one per line for OR, comma-separated for AND)",
+                help="Filter by Child Service Offering Name column in Excel"
+            )
         
-        keywords_excluded = st.text_area(
-            "Keywords to Exclude",
-            value="",
-            placeholder="Enter keywords to exclude from the search(one per line for OR, comma-separated for AND)",
-            help="Exclude rows containing these keywords in either Parent Offering or Child Name column"
-        )
+            keywords_excluded = st.text_area(
+                "Keywords to Exclude",
+                value="",
+                placeholder="Enter keywords to exclude from the search(one per line for OR, comma-separated for AND)",
+                help="Exclude rows containing these keywords in either Parent Offering or Child Name column"
+            )
         
-        new_apps = st.text_area(
-            "Applications/Other (one per line or comma-separated)",
-            value="",
-            help="It's optional - enter application names. If empty, offerings will be created without the names"
-        ).strip().split('\n')
-        new_apps = [a.strip() for a in new_apps if a.strip()]
+            new_apps = parse_apps(st.text_area(
+                "Applications/Other (one per line or comma-separated)",
+                value="",
+                help="It's optional - enter application names. If empty, offerings will be created without the names"
+            ))
         
-        sr_or_im = st.radio("Service Type", ["SR", "IM"], horizontal=True)
+            sr_or_im = st.radio("Service Type", ["SR", "IM"], horizontal=True)
         
-        add_prod = st.checkbox("Add 'Prod' to naming convention", value=True, help="Decide whether to include 'Prod' in generated service offering names")
+            add_prod = st.checkbox("Add 'Prod' to naming convention", value=True, help="Decide whether to include 'Prod' in generated service offering names")
         
-        delivery_manager = st.text_input("Delivery Manager", value="")
-
-        st.markdown("---")
-        business_criticality = st.selectbox(
-            "Business Criticality",
-            options=["", "1 - most critical", "2 - somewhat critical", "3 - less critical", "4 - not critical"],
-            index=0,
-            help="Set Business Criticality for all generated offerings. If empty, original values from source files will be used."
-        )
+            delivery_manager = st.text_input("Delivery Manager", value="")
 
-        approval_required = st.checkbox(
-            "Approval Required",
-            value=False,
-            help="Set Approval Required to true for all generated offerings. Default is always false."
-        )
+            st.markdown("---")
+            business_criticality = st.selectbox(
+                "Business Criticality",
+                options=BUSINESS_CRITICALITY_OPTIONS,
+                index=0,
+                help="Set Business Criticality for all generated offerings. If empty, original values from source files will be used."
+            )
+
+            approval_required = st.checkbox(
+                "Approval Required",
+                value=False,
+                help="Set Approval Required to true for all generated offerings. Default is always false."
+            )
         
-        if approval_required:
+            if approval_required:
 
-            use_per_app_approval = st.checkbox("Use different approval groups per application", value=False)
+                use_per_app_approval = st.checkbox("Use different approval groups per application", value=False)
             
-            if not use_per_app_approval:
-                approval_required_value = st.text_input(
-                    "Approval Details",
-                    value="",
-                    placeholder="Enter approval group name",
-                    help="Same approval group for all applications"
-                )
-                approval_groups_per_app = {}
-            else:
-                st.markdown("#### Approval Groups by Application")
-                st.info("Configure specific approval groups for each application. Leave empty if no approval group is known.")
+                if not use_per_app_approval:
+                    approval_required_value = st.text_input(
+                        "Approval Details",
+                        value="",
+                        placeholder="Enter approval group name",
+                        help="Same approval group for all applications"
+                    )
+                    approval_groups_per_app = {}
+                else:
+                    st.markdown("#### Approval Groups by Application")
+                    st.info("Configure specific approval groups for each application. Leave empty if no approval group is known.")
                 
-                approval_groups_per_app = {}
+                    approval_groups_per_app = {}
                 
-                if new_apps:
-                    # Create columns for better layout
-                    cols = st.columns(2)
+                    if new_apps:
+                        # Create columns for better layout
+                        cols = st.columns(2)
                     
-                    for i, app in enumerate(new_apps):
-                        col_idx = i % 2
-                        with cols[col_idx]:
-                            approval_groups_per_app[app] = st.text_input(
-                                f"Approval Group for {app}",
-                                value="",
-                                key=f"approval_{app}",
-                                placeholder=f"e.g., {app} leave empty if not needed)"
-                            )
-                else:
-                    st.warning("No applications defined. Add applications in Basic tab first.")
-                approval_required_value = "PER_APP"
-        else:
-            approval_required_value = "empty"
-            approval_groups_per_app = {}
-        
-        st.markdown("---")
-        change_subscribed_location = st.checkbox(
-            "Change Subscribed by Location",
-            value=False,
-            help="By default, Subscribed by Location will be set to 'Global'"
-        )
+                        for i, app in enumerate(new_apps):
+                            col_idx = i % 2
+                            with cols[col_idx]:
+                                approval_groups_per_app[app] = st.text_input(
+                                    f"Approval Group for {app}",
+                                    value="",
+                                    key=f"approval_{app}",
+                                    placeholder=f"e.g., {app} leave empty if not needed)"
+                                )
+                    else:
+                        st.warning("No applications defined. Add applications in Basic tab first.")
+                    approval_required_value = "PER_APP"
+            else:
+                approval_required_value = "empty"
+                approval_groups_per_app = {}
         
-        if change_subscribed_location:
-            custom_subscribed_location = st.text_input(
-                "Subscribed by Location",
-                value="",
-                placeholder="Enter custom location",
-                help="Custom value for Subscribed by Location column in Excel"
+            st.markdown("---")
+            change_subscribed_location = st.checkbox(
+                "Change Subscribed by Location",
+                value=False,
+                help="By default, Subscribed by Location will be set to 'Global'"
             )
-        else:
-            custom_subscribed_location = "Global"
         
-        st.markdown("---")
-        use_lvl2 = st.checkbox(
-            "Include Level 2 (Child SO lvl2)",
-            help="When checked, search in BOTH Child SO lvl1 AND Child SO lvl2 sheets in Excel"
-        )
+            if change_subscribed_location:
+                custom_subscribed_location = st.text_input(
+                    "Subscribed by Location",
+                    value="",
+                    placeholder="Enter custom location",
+                    help="Custom value for Subscribed by Location column in Excel"
+                )
+            else:
+                custom_subscribed_location = "Global"
         
-        if use_lvl2:
-            service_type = st.text_input(
-                "Service Type (for Lvl2 entries)",
-                value="",
-                placeholder="e.g., Application issue, Hardware problem",
-                help="Optional - this will be added to Lvl2 entries"
+            st.markdown("---")
+            use_lvl2 = st.checkbox(
+                "Include Level 2 (Child SO lvl2)",
+                help="When checked, search in BOTH Child SO lvl1 AND Child SO lvl2 sheets in Excel"
             )
-        else:
-            service_type = ""
-    
-    with tab2:
-        st.subheader("Direct Parent Offering Selection")
         
-        use_new_parent = st.checkbox(
-            "Use NEW specific parent offering (instead of parent keyword search in Excel)",
-            help="When checked, you can enter a completely new Parent Offering and Parent name - not inclided in the file yet"
-        )
-        
-        if use_new_parent:
-            st.info("📝 Enter the exact Parent Offering and Parent values to use")
-            if 'parent_offerings' not in st.session_state:
-                st.session_state.parent_offerings = [{"offering": "", "parent": ""}]
-            
-            st.markdown("### Parent Offering")
-
-            for i, pair in enumerate(st.session_state.parent_offerings):
-                col1, col2, col3 = st.columns([2, 2, 1])
-                
-                with col1:
-                    pair["offering"] = st.text_input(
-                        "New Parent Offering",
-                        value=pair["offering"],
-                        placeholder="e.g., [Parent HS PL IT] Software assistance",
-                        key=f"offering_{i}"
-                    )
-                
-                with col2:
-                    pair["parent"] = st.text_input(
-                        "New Parent",
-                        value=pair["parent"],
-                        placeholder="e.g., PL Software Support",
-                        key=f"parent_{i}"
-                    )
-                
-                with col3:
-                    if len(st.session_state.parent_offerings) > 1:
-                        if st.button("➖", key=f"remove_{i}", help="Remove this pair"):
-                            st.session_state.parent_offerings.pop(i)
-                            st.rerun()
-            
-            col1, col2 = st.columns(2)
-            with col1:
-                if st.button("➕ Add Parent Offering", use_container_width=True):
-                    st.session_state.parent_offerings.append({"offering": "", "parent": ""})
-                    st.rerun()
-            
-            with col2:
-                if len(st.session_state.parent_offerings) > 1:
-                    if st.button("➖ Remove Last", use_container_width=True):
-                        st.session_state.parent_offerings.pop()
-                        st.rerun()
-            
-            new_parent_offerings = "\n".join([pair["offering"] for pair in st.session_state.parent_offerings if pair["offering"]])
-            new_parents = "\n".join([pair["parent"] for pair in st.session_state.parent_offerings if pair["parent"]])
-    
-            if new_parent_offerings and new_parents:
-                st.success("✅ **Preview of Parent Offering pairs:**")
-                for i, pair in enumerate(st.session_state.parent_offerings):
-                    if pair["offering"] and pair["parent"]:
-                        st.write(f"{i+1}. Parent Offering: `{pair['offering']}` → New Parent: `{pair['parent']}`")
-        else:
-            new_parent_offerings = ""
-            new_parents = ""
-            if 'parent_offerings' in st.session_state:
-                del st.session_state.parent_offerings
+            if use_lvl2:
+                service_type = st.text_input(
+                    "Service Type (for Lvl2 entries)",
+                    value="",
+                    placeholder="e.g., Application issue, Hardware problem",
+                    help="Optional - this will be added to Lvl2 entries"
+                )
+            else:
+                service_type = ""
     
-    with tab3:
-        st.subheader("Schedule Settings")
-        
-        schedule_type = st.checkbox("Custom schedule per period")
-        create_multiple_schedules = st.checkbox("Create multiple schedules", help="Generate the same offerings with different schedules")
+        with tab2:
+            use_new_parent, new_parent_offerings, new_parents = new_parent_settings()
+    
+        with tab3:
+            schedule_suffixes, schedule_settings_per_country, rsp_duration, rsl_duration = schedule_settings()
+    
+        with tab4:
+            use_custom_commitments, custom_commitments_str, commitment_country = commitment_settings(sr_or_im)
+    
+        with tab5:
+            support_group, managed_by_group, support_groups_per_country, managed_by_groups_per_country = group_settings()
+    
+        with tab6:
+            st.subheader("Select proper naming convention:")
+            naming_style = st.radio("Naming convention", list(NAMING_STYLES), label_visibility="collapsed")
+            naming_flags = {flag: flag == NAMING_STYLES[naming_style] for flag in NAMING_STYLES.values() if flag}
         
-        schedule_suffixes = []
+            if naming_style in ("CORP", "CORP RecP", "CORP Dedicated Services", "CORP IT"):
+                delivering_tag = st.text_input(
+                    "Who delivers the service?", 
+                    value="",
+                    help="E.g. HS PL, DS DE, IT, Finance, etc."
+                )
+            else:
+                delivering_tag = ""
+            st.session_state['special_it'] = naming_flags["special_it"]
+    
+        with tab7:
+            st.markdown("### Global")
+            global_prod = st.checkbox("Global Prod value for Service Offerings column", value=False, key="global_prod_checkbox")
+            st.session_state['global_prod'] = global_prod
+            use_pluralization = True
+            st.markdown("### Service Offerings | Depend On")
+            use_custom_depend_on = st.checkbox("Use custom value for column 'Service Offerings | Depend On'", value=False, 
+                                              help="Overrides automatic value based on selected prefix and applications")
         
-        if not schedule_type and create_multiple_schedules:
-            schedule_simple = st.text_area(
-                "Schedules", 
-                value="", 
-                placeholder="Mon-Fri 9-17\nMon-Fri 8-16\nMon-Sun 24/7",
-                height=150
-            )
-            schedule_suffixes = [s.strip() for s in schedule_simple.split('\n') if s.strip()]
-        elif schedule_type and not create_multiple_schedules:
-            schedule_parts = []
-            num_periods = st.number_input("Number of periods", min_value=1, max_value=5, value=2)
-            
-            for i in range(num_periods):
-                st.markdown(f"**Period {i+1}**")
-                col1, col2 = st.columns([2, 1])
+            if use_custom_depend_on:
+                col1, col2 = st.columns([1, 2])
                 with col1:
-                    period = st.text_input(
-                        f"Days", 
-                        value="", 
-                        placeholder="e.g. Mon-Thu or Fri or Sat-Sun",
-                        key=f"schedule_period_{i}",
-                        label_visibility="collapsed"
-                    )
-                with col2:
-                    hours = st.text_input(
-                        f"Hours", 
-                        value="", 
-                        placeholder="e.g. 9-17",
-                        key=f"schedule_hours_{i}",
-                        label_visibility="collapsed"
+                    depend_on_prefix = st.selectbox(
+                        "Select Prefix",
+                        options=["HS PL", "DS PL", "HS DE", "DS DE", "DS UA", "DS MD", "DS CY", "DS RO", "DS TR", "Global"],
+                        index=0,
+                        help="Choose the service prefix"
                     )
-                
-                if period and hours:
-                    schedule_parts.append(f"{period} {hours}")
-            
-            schedule_suffix = " ".join(schedule_parts) if schedule_parts else ""
-            schedule_suffixes = [schedule_suffix] if schedule_suffix else []
-        elif schedule_type and create_multiple_schedules:
-            num_schedules = st.number_input("Number of schedules", min_value=1, max_value=5, value=2)
-            schedule_suffixes = []
+                    st.session_state['depend_on_prefix'] = depend_on_prefix
+                    st.session_state['use_custom_depend_on'] = True
             
-            for sched_idx in range(num_schedules):
-                st.markdown(f"### Schedule {sched_idx + 1}")
-                schedule_parts = []
-                num_periods = st.number_input(f"Number of periods for schedule {sched_idx + 1}", min_value=1, max_value=5, value=2, key=f"num_periods_{sched_idx}")
-                
-                for i in range(num_periods):
-                    st.markdown(f"**Period {i+1}**")
-                    col1, col2 = st.columns([2, 1])
-                    with col1:
-                        period = st.text_input(
-                            f"Days", 
-                            value="", 
-                            placeholder="e.g. Mon-Thu or Fri or Sat-Sun",
-                            key=f"schedule_period_{sched_idx}_{i}",
-                            label_visibility="collapsed"
-                        )
-                    with col2:
-                        hours = st.text_input(
-                            f"Hours", 
-                            value="", 
-                            placeholder="e.g. 9-17",
-                            key=f"schedule_hours_{sched_idx}_{i}",
-                            label_visibility="collapsed"
-                        )
-                    
-                    if period and hours:
-                        schedule_parts.append(f"{period} {hours}")
-                
-                if schedule_parts:
-                    schedule_suffix = " ".join(schedule_parts)
-                    schedule_suffixes.append(schedule_suffix)
-        else:
-            schedule_simple = st.text_input("Schedule", value="", placeholder="e.g. Mon-Fri 9-17")
-            schedule_suffixes = [schedule_simple] if schedule_simple else []
-        
-        st.markdown("---")
-        
-        use_per_country_schedules = st.checkbox("Use different schedules per country", help="Define specific schedules for different countries")
-        schedule_settings_per_country = {}
-        
-        if use_per_country_schedules:
-            st.markdown("Schedule Settings per Country")
-            available_countries = ["HS PL", "DS PL", "DE", "MD", "UA", "DS CY", "DS RO", "DS TR"]
-            country_tabs = st.tabs(available_countries)
-            
-            for idx, country in enumerate(available_countries):
-                with country_tabs[idx]:
-                    st.markdown(f"{country} Schedules")
-                    
-                    country_schedules = st.text_area(
-                        f"Schedules for {country}",
-                        value="",
-                        placeholder="Mon-Fri 9-17\nMon-Fri 8-16\nMon-Sun 24/7",
-                        height=150,
-                        key=f"schedule_{country.replace(' ', '_')}"
-                    )
-                    
-                    if country_schedules.strip():
-                        if country == "DS CY":
-                            schedule_settings_per_country["CY"] = country_schedules.strip()
-                        elif country == "DS RO":
-                            schedule_settings_per_country["RO"] = country_schedules.strip()
-                        elif country == "DS TR":
-                            schedule_settings_per_country["TR"] = country_schedules.strip()
-                        else:
-                            schedule_settings_per_country[country] = country_schedules.strip()
-        
-        st.markdown("### SLA")
-        col_rsp, col_rsl = st.columns(2)
-        with col_rsp:
-            rsp_duration = st.text_input("RSP Duration", value="")
-        with col_rsl:
-            rsl_duration = st.text_input("RSL Duration", value="")
-    
-    with tab4:
-        st.subheader("Service Commitments")
-        
-        use_custom_commitments = st.checkbox("Define custom Service Commitments", help="If unchecked, commitments will be copied from the source files")
-        
-        if use_custom_commitments:
-            commitment_country = st.selectbox("Country", ["CY", "DE", "MD", "PL", "RO", "TR", "UA"])
-            
-            st.markdown("Service Commitments Configuration")
-            commitment_lines = []
-            num_commitments = st.number_input("Number of commitment", min_value=1, max_value=10, value=2)
-            
-            for i in range(num_commitments):
-                st.markdown(f"Commitment Line {i+1}")
-                col1, col2, col3, col4 = st.columns([1, 1, 2, 1])
-                
-                with col1:
-                    line_type = st.selectbox(f"Type", ["RSP", "RSL"], key=f"commit_type_{i}")
-                
                 with col2:
-                    priority = st.selectbox(f"Priority", ["P1", "P2", "P3", "P4", "P1-P2", "P3-P4", "P1-P4"], key=f"commit_priority_{i}")
-                
-                with col3:
-                    schedule = st.text_input(f"Schedule", placeholder="e.g. Mon-Fri 6-21", key=f"commit_schedule_{i}")
-                
-                with col4:
-                    time = st.text_input(f"Time", placeholder="e.g. 2h, 1d", key=f"commit_time_{i}")
-                
-                if schedule and time:
-                    if st.session_state.get('use_custom_depend_on', False) and st.session_state.get('depend_on_prefix'):
-                        prefix_to_use = st.session_state.get('depend_on_prefix')
-                        if prefix_to_use == "Global":
-                            if st.session_state.get('special_it', False):
-                                prefix_to_use = "Global"
-                            else:
-                                prefix_to_use = "Global Prod" if st.session_state.get('global_prod', False) else "Global"
-                        else:
-                            if st.session_state.get('special_it', False):
-                                prefix_to_use = st.session_state.get('depend_on_prefix')
-                            else:
-                                if st.session_state.get('global_prod', False):
-                                    prefix_to_use = f"{st.session_state.get('depend_on_prefix')} Prod"
-                                else:
-                                    prefix_to_use = st.session_state.get('depend_on_prefix')
-                    else:
-                        prefix_to_use = commitment_country
+                    if new_apps:
+                        num_apps = len(new_apps)
+                        dynamic_height = max(80, min(300, 60 + (num_apps * 25)))
                     
-                    line = f"[{prefix_to_use}] SLA {sr_or_im} {line_type} {schedule} {priority} {time}"
-                    commitment_lines.append(line)
-                    if sr_or_im == "SR" and line_type == "RSL":
-                        ola_line = f"[{prefix_to_use}] OLA {sr_or_im} RSL {schedule} {priority} {time}"
-                        commitment_lines.append(ola_line)
-            if commitment_lines:
-                st.markdown("### Preview")
-                st.code("\n".join(commitment_lines))
-                
-            custom_commitments_str = "\n".join(commitment_lines) if commitment_lines else ""
-        else:
-            custom_commitments_str = ""
-            commitment_country = None
-    
-    with tab5:
-        st.subheader("Support Groups")
-        use_per_country_groups = st.checkbox("Use different support groups per country", value=False)
-        
-        if not use_per_country_groups:
-            st.markdown("#### Global Support Groups")
-            support_group = st.text_input("Support Group", value="", help="Same support group for all countries")
-            managed_by_group = st.text_input(
-                "Managed by Group", 
-                value="",
-                help="Optional - if empty, Support Group value will be copied"
-            )
-            support_groups_per_country = {}
-            managed_by_groups_per_country = {}
-            all_countries = ["HS PL", "DS PL", "DE", "UA", "MD", "CY", "RO", "TR"]
-            for country_key in all_countries:
-                if support_group:  # Only populate if there's a value
-                    support_groups_per_country[country_key] = support_group
-                    managed_by_groups_per_country[country_key] = managed_by_group if managed_by_group else support_group
-        else:
-            st.markdown("Support Groups by Country")
-            st.info("Select countries to configure.")
-            countries = ["HS PL", "DS PL", "DE", "UA", "MD", "DS CY", "DS RO", "DS TR"]
-            support_groups_per_country = {}
-            managed_by_groups_per_country = {}
-            cols = st.columns(2)
-            
-            for i, country in enumerate(countries):
-                col_idx = i % 2
-                with cols[col_idx]:
-                    country_enabled = st.checkbox(f"Configure {country}", key=f"enable_{country}")
-                    
-                    if country_enabled:
-                        if country == "DE":
-                            num_de_groups = st.number_input(
-                                f"Number of Support Groups for DE", 
-                                min_value=1, 
-                                max_value=5, 
-                                value=1, 
-                                key=f"num_groups_DE",
-                                help="DE can have multiple support groups for the same offerings"
+                        if len(new_apps) == 1:
+                            st.text_input(
+                                "Application Name",
+                                value=new_apps[0],
+                                disabled=True,
+                                help=f"Will automatically use: {new_apps[0]}"
                             )
-                            
-                            de_support_groups = []
-                            de_managed_groups = []
-                            
-                            for group_idx in range(num_de_groups):
-                                st.markdown(f"**DE Support Group {group_idx + 1}**")
-                                de_support_group = st.text_input(
-                                    f"Support Group {group_idx + 1}",
-                                    value="",
-                                    key=f"support_DE_{group_idx}",
-                                    placeholder=f"e.g., DE IT Support Team {group_idx + 1}"
-                                )
-                                de_managed_group = st.text_input(
-                                    f"Managed by Group {group_idx + 1}",
-                                    value="",
-                                    key=f"managed_DE_{group_idx}",
-                                    placeholder=f"Optional - uses Support Group if empty",
-                                    help="If empty, will use the Support Group value"
-                                )
-                                
-                                if de_support_group:
-                                    de_support_groups.append(de_support_group)
-                                    de_managed_groups.append(de_managed_group if de_managed_group else de_support_group)
-                            
-                            support_groups_per_country[country] = "\n".join(de_support_groups) if de_support_groups else ""
-                            managed_by_groups_per_country[country] = "\n".join(de_managed_groups) if de_managed_groups else ""
                         else:
-                            backend_key = country
-                            if country == "DS CY":
-                                backend_key = "CY"
-                            elif country == "DS RO":
-                                backend_key = "RO"
-                            elif country == "DS TR":
-                                backend_key = "TR"
-                            
-                            support_groups_per_country[backend_key] = st.text_input(
-                                f"Support Group",
-                                value="",
-                                key=f"support_{country}",
-                                placeholder=f"e.g., {country} IT Support"
-                            )
-                            managed_by_groups_per_country[backend_key] = st.text_input(
-                                f"Managed by Group",
-                                value="",
-                                key=f"managed_{country}",
-                                placeholder=f"Optional - uses Support Group if empty",
-                                help="If empty, will use the Support Group value"
+                            st.text_area(
+                                "Application Names",
+                                value="\n".join(new_apps),
+                                disabled=True,
+                                height=dynamic_height,
+                                help=f"Will automatically use each app: {', '.join(new_apps)}"
                             )
+                        app_names_display = new_apps
                     else:
-                        backend_key = country
-                        if country == "DS CY":
-                            backend_key = "CY"
-                        elif country == "DS RO":
-                            backend_key = "RO"
-                        elif country == "DS TR":
-                            backend_key = "TR"
-                        
-                        support_groups_per_country[backend_key] = ""
-                        managed_by_groups_per_country[backend_key] = ""
-            support_group = ""
-            managed_by_group = ""
-    
-    with tab6:
-        st.subheader("Select proper naming convention:")
-        col = st.container()
-        with col:
-            require_corp = st.checkbox("CORP")
-            require_recp = st.checkbox("CORP RecP")
-            require_corp_dedicated = st.checkbox("CORP Dedicated Services")
-            require_corp_it = st.checkbox("CORP IT")
-            require_dedicated = st.checkbox("Dedicated Services")
-            special_dak = st.checkbox("DAK (Business Services)")
-            special_hr = st.checkbox("HR")
-            special_it = st.checkbox("IT")
-            special_medical = st.checkbox("Medical")
-        
-        all_selected = sum([require_corp, require_recp, special_it, special_hr, special_medical, special_dak, require_corp_it, require_corp_dedicated, require_dedicated])
-        if all_selected > 1:
-            st.error("⚠️ Please select only one naming type")
-            require_corp = require_recp = special_it = special_hr = special_medical = special_dak = require_corp_it = require_corp_dedicated = require_dedicated = False
-        elif all_selected == 0:
-            st.info("Standard naming will be used if nothing is selected")
-        
-        if require_corp or require_recp or require_corp_it or require_corp_dedicated:
-            delivering_tag = st.text_input(
-                "Who delivers the service?", 
-                value="",
-                help="E.g. HS PL, DS DE, IT, Finance, etc."
-            )
-        else:
-            delivering_tag = ""
-        st.session_state['special_it'] = special_it
-    
-    with tab7:
-        st.markdown("### Global")
-        global_prod = st.checkbox("Global Prod value for Service Offerings column", value=False, key="global_prod_checkbox")
-        st.session_state['global_prod'] = global_prod
-        use_pluralization = True
-        st.markdown("### Service Offerings | Depend On")
-        use_custom_depend_on = st.checkbox("Use custom value for column 'Service Offerings | Depend On'", value=False, 
-                                          help="Overrides automatic value based on selected prefix and applications")
-        
-        if use_custom_depend_on:
-            col1, col2 = st.columns([1, 2])
-            with col1:
-                depend_on_prefix = st.selectbox(
-                    "Select Prefix",
-                    options=["HS PL", "DS PL", "HS DE", "DS DE", "DS UA", "DS MD", "DS CY", "DS RO", "DS TR", "Global"],
-                    index=0,
-                    help="Choose the service prefix"
-                )
-                st.session_state['depend_on_prefix'] = depend_on_prefix
-                st.session_state['use_custom_depend_on'] = True
-            
-            with col2:
-                if new_apps:
-                    num_apps = len(new_apps)
-                    dynamic_height = max(80, min(300, 60 + (num_apps * 25)))
-                    
-                    if len(new_apps) == 1:
                         st.text_input(
                             "Application Name",
-                            value=new_apps[0],
+                            value="(no apps specified)",
                             disabled=True,
-                            help=f"Will automatically use: {new_apps[0]}"
+                            help="Add applications in Basic tab to see them"
                         )
+                        app_names_display = ["(no app)"]
+                current_special_it = st.session_state.get('special_it', False)
+                depend_on_prefix_tag = depend_on_prefix
+
+                if new_apps:
+                    if len(new_apps) == 1:
+                        app_name = get_plural_form_preview(new_apps[0]) if use_pluralization else new_apps[0]
+                        preview_prefix = f"{depend_on_prefix_tag} Prod" if global_prod else depend_on_prefix_tag
+                        preview_value = f"[{preview_prefix}] {app_name}"
+                        st.info(f"Preview: `{preview_value}` (IT: {current_special_it}, Global Prod: {global_prod})")
+                        custom_depend_on_value = f"[{depend_on_prefix_tag}] {app_name}"
                     else:
-                        st.text_area(
-                            "Application Names",
-                            value="\n".join(new_apps),
-                            disabled=True,
-                            height=dynamic_height,
-                            help=f"Will automatically use each app: {', '.join(new_apps)}"
-                        )
-                    app_names_display = new_apps
+                        preview_prefix = f"{depend_on_prefix_tag} Prod" if global_prod else depend_on_prefix_tag
+                        st.info(f"Preview for each app: (IT: {current_special_it}, Global Prod: {global_prod})")
+                        app_names = [get_plural_form_preview(app) if use_pluralization else app for app in new_apps]
+                        st.text("\n".join(f"• `[{preview_prefix}] {app_name}`" for app_name in app_names))
+                        custom_depend_on_value = f"[{depend_on_prefix_tag}]"
                 else:
-                    st.text_input(
-                        "Application Name",
-                        value="(no apps specified)",
-                        disabled=True,
-                        help="Add applications in Basic tab to see them"
-                    )
-                    app_names_display = ["(no app)"]
-            current_special_it = st.session_state.get('special_it', False)
-            depend_on_prefix_tag = depend_on_prefix
-
-            if new_apps:
-                if len(new_apps) == 1:
-                    app_name = get_plural_form_preview(new_apps[0]) if use_pluralization else new_apps[0]
                     preview_prefix = f"{depend_on_prefix_tag} Prod" if global_prod else depend_on_prefix_tag
-                    preview_value = f"[{preview_prefix}] {app_name}"
+                    preview_value = f"[{preview_prefix}]"
                     st.info(f"Preview: `{preview_value}` (IT: {current_special_it}, Global Prod: {global_prod})")
-                    custom_depend_on_value = f"[{depend_on_prefix_tag}] {app_name}"
-                else:
-                    preview_prefix = f"{depend_on_prefix_tag} Prod" if global_prod else depend_on_prefix_tag
-                    st.info(f"Preview for each app: (IT: {current_special_it}, Global Prod: {global_prod})")
-                    for app in new_apps:
-                        app_name = get_plural_form_preview(app) if use_pluralization else app
-                        st.text(f"• `[{preview_prefix}] {app_name}`")
                     custom_depend_on_value = f"[{depend_on_prefix_tag}]"
             else:
-                preview_prefix = f"{depend_on_prefix_tag} Prod" if global_prod else depend_on_prefix_tag
-                preview_value = f"[{preview_prefix}]"
-                st.info(f"Preview: `{preview_value}` (IT: {current_special_it}, Global Prod: {global_prod})")
-                custom_depend_on_value = f"[{depend_on_prefix_tag}]"
-        else:
-            custom_depend_on_value = ""
-            st.session_state['use_custom_depend_on'] = False
+                custom_depend_on_value = ""
+                st.session_state['use_custom_depend_on'] = False
         
-        st.markdown("### Aliases")
-        use_same_as_apps = st.checkbox("Use same values as Application Names", 
-                                      value=False,
-                                      help="When checked, aliases will automatically use the same values as the application names but for English names ONLY")
-
-        if use_same_as_apps:
-            aliases_on = True
-            aliases_value = "USE_APP_NAMES"
-            selected_languages = ["ENG"]
+            st.markdown("### Aliases")
+            use_same_as_apps = st.checkbox("Use same values as Application Names", 
+                                          value=False,
+                                          help="When checked, aliases will automatically use the same values as the application names but for English names ONLY")
+
+            if use_same_as_apps:
+                aliases_on = True
+                aliases_value = "USE_APP_NAMES"
+                selected_languages = ["ENG"]
             
-            if new_apps:
-                st.success(f"✅ **Aliases will use:** {', '.join(new_apps)} **in ENG column**")
+                if new_apps:
+                    st.success(f"✅ **Aliases will use:** {', '.join(new_apps)} **in ENG column**")
+                else:
+                    st.warning("⚠️ No application names defined. Add applications in Basic tab first.")
             else:
-                st.warning("⚠️ No application names defined. Add applications in Basic tab first.")
-        else:
-            aliases_on = False
-            aliases_value = ""
-            selected_languages = []
+                aliases_on = False
+                aliases_value = ""
+                selected_languages = []
 
-        use_per_country_aliases = False
-        aliases_per_country = {}
 
 st.markdown("---")
 
 if st.button("🚀 Generate Service Offerings", type="primary", use_container_width=True):
+    # Collect every problem first, so they can all be fixed before the next click
+    errors = []
     if not uploaded_files:
-        st.error("⚠️ Please upload at least one Excel file")
-    elif use_new_parent and (not new_parent_offerings or not new_parents):
-        st.error("⚠️ When using specific parent offering, please add at least one Parent Offering")
-    elif not use_new_parent and not keywords_parent and not keywords_child:
-        st.error("⚠️ Please enter at least one keyword in either Parent Offering or Child Service Offering")
-    elif not schedule_suffixes or not any(schedule_suffixes):
-        st.error("⚠️ Please configure at least one schedule")
-    elif all_selected > 1:
-        st.error("⚠️ Please select only one naming type")
+        # The settings tabs are only built after an upload, so there is nothing else to check yet
+        errors.append("Please upload at least one Excel file")
     else:
+        if use_new_parent and (not new_parent_offerings or not new_parents):
+            errors.append("When using specific parent offering, please add at least one Parent Offering")
+        if not use_new_parent and not keywords_parent and not keywords_child:
+            errors.append("Please enter at least one keyword in either Parent Offering or Child Service Offering")
+        if not any(schedule_suffixes or ()):
+            errors.append("Please configure at least one schedule")
+
+    if errors:
+        st.error("\n\n".join(f"⚠️ {error}" for error in errors))
+    else:
+        generator_kwargs = dict(
+            keywords_parent=keywords_parent if not use_new_parent else "",
+            keywords_child=keywords_child if not use_new_parent else "",
+            new_apps=new_apps,
+            schedule_suffixes=schedule_suffixes,
+            delivery_manager=delivery_manager,
+            global_prod=global_prod,
+            use_pluralization=use_pluralization,
+            rsp_duration=rsp_duration,
+            rsl_duration=rsl_duration,
+            sr_or_im=sr_or_im,
+            **naming_flags,
+            delivering_tag=delivering_tag,
+            support_group=support_group,
+            managed_by_group=managed_by_group,
+            aliases_on=aliases_on,
+            aliases_value=aliases_value,
+            use_custom_commitments=use_custom_commitments,
+            custom_commitments_str=custom_commitments_str,
+            commitment_country=commitment_country,
+            use_new_parent=use_new_parent,
+            new_parent_offering=new_parent_offerings,
+            new_parent=new_parents,
+            keywords_excluded=keywords_excluded if not use_new_parent else "",
+            use_lvl2=use_lvl2,
+            service_type_lvl2=service_type,
+            support_groups_per_country=support_groups_per_country,
+            managed_by_groups_per_country=managed_by_groups_per_country,
+            schedule_settings_per_country=schedule_settings_per_country,
+            use_custom_depend_on=use_custom_depend_on,
+            custom_depend_on_value=custom_depend_on_value,
+            selected_languages=selected_languages,
+            business_criticality=business_criticality,
+            approval_required=approval_required,
+            approval_required_value=approval_required_value,
+            approval_groups_per_app=approval_groups_per_app,
+            change_subscribed_location=change_subscribed_location,
+            custom_subscribed_location=custom_subscribed_location,
+            add_prod=add_prod
+        )
+
         try:
-            with tempfile.TemporaryDirectory() as temp_dir:
-                src_dir = Path(temp_dir) / "input"
-                out_dir = Path(temp_dir) / "output"
-                src_dir.mkdir(exist_ok=True)
-                out_dir.mkdir(exist_ok=True)
-                
-                # Save uploaded files
+            with st.spinner("🔄 Generating service offerings..."):
+                # The cache key includes each file's read position, so always hash from the start
                 for uploaded_file in uploaded_files:
-                    file_path = src_dir / uploaded_file.name
-                    with open(file_path, "wb") as f:
-                        f.write(uploaded_file.getbuffer())
-                
-                with st.spinner("🔄 Generating service offerings..."):
-                    try:
-                        result_file = run_generator(
-                            keywords_parent=keywords_parent if not use_new_parent else "",
-                            keywords_child=keywords_child if not use_new_parent else "",
-                            new_apps=new_apps,
-                            schedule_suffixes=schedule_suffixes,
-                            delivery_manager=delivery_manager,
-                            global_prod=global_prod,
-                            use_pluralization=use_pluralization,
-                            rsp_duration=rsp_duration,
-                            rsl_duration=rsl_duration,
-                            sr_or_im=sr_or_im,
-                            require_corp=require_corp,
-                            require_recp=require_recp,
-                            delivering_tag=delivering_tag,
-                            support_group=support_group,
-                            managed_by_group=managed_by_group,
-                            aliases_on=aliases_on,
-                            aliases_value=aliases_value,
-                            aliases_per_country=aliases_per_country,
-                            src_dir=src_dir,
-                            out_dir=out_dir,
-                            special_it=special_it,
-                            special_hr=special_hr,
-                            special_medical=special_medical,
-                            special_dak=special_dak,
-                            use_custom_commitments=use_custom_commitments,
-                            custom_commitments_str=custom_commitments_str,
-                            commitment_country=commitment_country,
-                            require_corp_it=require_corp_it,
-                            require_corp_dedicated=require_corp_dedicated,
-                            require_dedicated=require_dedicated,
-                            use_new_parent=use_new_parent,
-                            new_parent_offering=new_parent_offerings,
-                            new_parent=new_parents,
-                            keywords_excluded=keywords_excluded if not use_new_parent else "",
-                            use_lvl2=use_lvl2,
-                            service_type_lvl2=service_type,
-                            support_groups_per_country=support_groups_per_country,
-                            managed_by_groups_per_country=managed_by_groups_per_country,
-                            schedule_settings_per_country=schedule_settings_per_country,
-                            use_custom_depend_on=use_custom_depend_on,
-                            custom_depend_on_value=custom_depend_on_value,
-                            selected_languages=selected_languages,
-                            business_criticality=business_criticality,
-                            approval_required=approval_required,
-                            approval_required_value=approval_required_value,
-                            approval_groups_per_app=approval_groups_per_app,
-                            change_subscribed_location=change_subscribed_location,
-                            custom_subscribed_location=custom_subscribed_location,
-                            add_prod=add_prod
-                        )
-                        
-                        if result_file is True:
-                            import time
-                            time.sleep(0.5)
-                            excel_files = list(out_dir.glob("Generated_Service_Offerings_*.xlsx"))
-                            if excel_files:
-                                result_file = max(excel_files, key=lambda p: p.stat().st_mtime)
-                                st.info(f"Found generated file: {result_file.name}")
-                            else:
-                                all_xlsx = list(out_dir.glob("*.xlsx"))
-                                if all_xlsx:
-                                    result_file = max(all_xlsx, key=lambda p: p.stat().st_mtime)
-                                    st.info(f"Found file: {result_file.name}")
-                                else:
-                                    st.error("❌ No Excel files found in output directory")
-                                    result_file = None
-                        
-                        elif isinstance(result_file, str):
-                            result_file = Path(result_file)
-                        elif result_file and not isinstance(result_file, Path):
-                            st.error(f"❌ Invalid result type: {type(result_file)}")
-                            result_file = None
-                            
-                    except Exception as gen_error:
-                        st.error(f"❌ Error during generation: {str(gen_error)}")
-                        st.exception(gen_error)
-                        result_file = None
-                
-                if result_file and isinstance(result_file, Path) and result_file.exists():
-                    with open(result_file, "rb") as f:
-                        file_data = f.read()
-                    
-                    if len(file_data) > 0:
-                        st.success("✅ Service offerings generated successfully!")
-                        st.download_button(
-                            label="📥 Download generated file",
-                            data=file_data,
-                            file_name=result_file.name,
-                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                            use_container_width=True
-                        )
-                        st.info(f"Generated: {result_file.name} ({len(file_data):,} bytes)")
-                    else:
-                        st.error("❌ Generated file is empty")
+                    uploaded_file.seek(0)
+                result = generate_offerings(tuple(uploaded_files), generator_kwargs)
+
+            if result:
+                result_name, file_data = result
+                if len(file_data) > 0:
+                    st.success("✅ Service offerings generated successfully!")
+                    st.download_button(
+                        label="📥 Download generated file",
+                        data=file_data,
+                        file_name=result_name,
+                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                        on_click="ignore",  # downloading must not rerun the whole app
+                        use_container_width=True
+                    )
+                    st.info(f"Generated: {result_name} ({len(file_data):,} bytes)")
                 else:
-                    st.error("❌ Failed to generate file. Please check your configuration.")
-                    if result_file:
-                        st.error(f"Debug: result_file = {result_file}, exists = {result_file.exists() if isinstance(result_file, Path) else 'N/A'}")
-                    
+                    st.error("❌ Generated file is empty")
+            else:
+                st.error("❌ Failed to generate file. Please check your configuration.")
+
         except ValueError as e:
             error_msg = str(e)
             if "duplicate" in error_msg.lower() or "no matching offerings" in error_msg.lower():
@@ -790,7 +775,9 @@ if st.button("🚀 Generate Service Offerings", type="primary", use_container_wi
                 st.error(f"❌ Error: {error_msg}")
         except Exception as e:
             st.error(f"❌ Unexpected error: {str(e)}")
-            st.exception(e)
+            # Collapsed, and only the innermost frames - the message above is what most users need
+            with st.expander("Traceback"):
+                st.code("".join(traceback.format_exception(e)[-10:]), language="text")
 
 st.markdown("---")
 st.markdown(
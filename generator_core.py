@@ -1,10 +1,15 @@
 import datetime as dt
+import functools
+import io
+import operator
 import re
 import time
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import pandas as pd
-from openpyxl import load_workbook
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Alignment, PatternFill
 from openpyxl.utils import get_column_letter
 from openpyxl.comments import Comment
@@ -25,65 +30,73 @@ need_cols = [
 
 discard_lc = {"retired", "retiring", "end of life", "end of support"}
 
+SOURCE_FILE_PATTERN = "ALL_Service_Offering_*.xlsx"
+SOURCE_SHEETS = ["Child SO lvl1", "Child SO lvl2"]
+# Most source workbooks read at the same time
+SOURCE_READ_WORKERS = 8
+
+# Receivers generated per country - CY, UA, MD, RO and TR only have DS
+RECEIVERS_BY_COUNTRY = {
+    "PL": ("HS PL", "DS PL"),
+    "CY": ("DS CY",),
+    "DE": ("HS DE", "DS DE"),
+    "UA": ("DS UA",),
+    "MD": ("DS MD",),
+    "RO": ("DS RO",),
+    "TR": ("DS TR",),
+}
+
+# calamine parses the source workbooks much faster; without it pandas' default (openpyxl) reader is used
+try:
+    import python_calamine  # noqa: F401
+    EXCEL_READ_ENGINE = "calamine"
+except ImportError:
+    EXCEL_READ_ENGINE = None
+
+# Patterns used for every generated row, compiled once
+INCIDENT_SOLVING_RE = re.compile(r'\bincident\s+solving\b', re.IGNORECASE)
+PARENT_TAG_RE = re.compile(r'\[Parent\s+(.*?)\]', re.I)
+PRIORITY_RANGE_RE = re.compile(r'(P\d+-P\d+)')
+PRIORITY_TAIL_RE = re.compile(r"(P\d+-P\d+)\s+.*$")
+RSP_SCHEDULE_RE = re.compile(r"RSP\s+[^P]+")
+RSL_SCHEDULE_RE = re.compile(r"RSL\s+[^P]+")
+APP_SEPARATOR_RE = re.compile(r'[,\n;]+')
+CORP_RECEIVER_RE = re.compile(r'\[.*?CORP\s+([A-Z]{2}\s+[A-Z]{2})')
+HS_PL_RE = re.compile(r'\bHS\s+PL\b', re.IGNORECASE)
+DS_PL_RE = re.compile(r'\bDS\s+PL\b', re.IGNORECASE)
+# Keywords that keep "Prod" out of a name (matched on lowercased text)
+NO_PROD_RE = re.compile(r"hardware|mailbox|network|mobile|security")
+DEDICATED_NO_PROD_RE = re.compile(
+    r"hardware|mailbox|network|mobile|security|onboarding|offboarding"
+    r"|generic request|restore from backup|change employee information"
+)
+
 def ensure_incident_naming(name):
     """
     Ensure that if any keyword is 'incident', then 'solving' is right after 'incident' and then app name
     This function reorganizes the name to ensure proper order: incident solving [app] [other parts]
     """
-    if re.search(r'\bincident\s+solving\b', name, re.IGNORECASE):
+    if INCIDENT_SOLVING_RE.search(name):
         return name
-    
-    parts = name.split()
-    new_parts = []
-    i = 0
-    
-    while i < len(parts):
-        if parts[i].lower() == "incident":
-            new_parts.append(parts[i])
-            new_parts.append("solving")
-            if i + 1 < len(parts) and parts[i + 1].lower() == "solving":
-                i += 1
-        elif parts[i].lower() == "solving":
- 
-            pass
-        else:
-            new_parts.append(parts[i])
-        i += 1
-    
-    final_parts = []
-    i = 0
-    
-    while i < len(new_parts):
-        if i > 0 and new_parts[i-1].lower() == "incident" and new_parts[i].lower() == "solving":
-            final_parts.append(new_parts[i])
-        elif new_parts[i].lower() == "incident":
-            j = i + 1
-            app_parts = []
-            while j < len(new_parts) and new_parts[j].lower() != "solving":
-                app_parts.append(new_parts[j])
-                j += 1
-            final_parts.append(new_parts[i])
-            if j < len(new_parts) and new_parts[j].lower() == "solving":
-                final_parts.append("solving")
-                final_parts.extend(app_parts)
-                i = j
-            else:
-                final_parts.append("solving")
-                final_parts.extend(app_parts)
-                i = j - 1
-        else:
-            final_parts.append(new_parts[i])
-        i += 1
-    
-    return " ".join(final_parts)
+    lowered = name.lower()
+    if "incident" not in lowered and "solving" not in lowered:
+        # Nothing to move or drop - most names only get their spacing normalized
+        return " ".join(name.split())
+
+    # One pass over the words: drop stray "solving" words and put "solving" right after each "incident"
+    parts = [part for part in name.split() if part.lower() != "solving"]
+    return " ".join(f"{part} solving" if part.lower() == "incident" else part for part in parts)
 
+# The same parent offerings recur across many generated rows and builders, so the parsed parts are cached
+@functools.lru_cache(maxsize=4096)
 def extract_parent_info(parent_offering):
     """Extract the content between [Parent ...] from parent offering"""
-    match = re.search(r'\[Parent\s+(.*?)\]', str(parent_offering), re.I)
+    match = PARENT_TAG_RE.search(str(parent_offering))
     if match:
         return match.group(1).strip()
     return ""
 
+@functools.lru_cache(maxsize=4096)
 def extract_catalog_name(parent_offering):
     """Extract the catalog name after the brackets"""
     parts = str(parent_offering).split(']', 1)
@@ -112,6 +125,28 @@ def get_division_and_country(parent_content, country, delivering_tag):
     
     return division, country
 
+def get_country_and_topic(parent_content):
+    """Country code and first topic word of the parent content, as used by the CORP/RecP/Dedicated names"""
+    country = ""
+    for part in parent_content.split():
+        if len(part) == 2 and part.isupper() and part not in ["HS", "DS"]:
+            country = part
+        elif part not in ["HS", "DS", "Parent", "RecP"] and not (len(part) == 2 and part.isupper()):
+            return country, part
+    return country, ""
+
+def get_delivering_prefix(delivering_tag, country, division):
+    """Name prefix parts for who delivers the service - the delivering tag, or division and country without one"""
+    if not delivering_tag:
+        return [division, country]
+    # For MD/UA/RO/TR, override with DS
+    if country in ["UA", "MD", "RO", "TR"]:
+        return ["DS", country]
+    return delivering_tag.split()
+
+# Name builders are pure functions of their arguments, and the same parent offering/app/schedule
+# combinations recur across source rows, receivers and reruns, so finished names are memoized
+@functools.lru_cache(maxsize=16384)
 def build_lvl2_name(parent_offering, sr_or_im, app, schedule_suffix, service_type_lvl2):
     """Build name for Lvl2 entries - SR/IM is added to both Parent Offering parsing and final name"""
     parent_content = extract_parent_info(parent_offering)
@@ -123,10 +158,8 @@ def build_lvl2_name(parent_offering, sr_or_im, app, schedule_suffix, service_typ
     if not has_sr_im:
         # Insert SR/IM as the first element after "Parent" was removed
         parts.insert(0, sr_or_im)
-        parent_content = " ".join(parts)
     
     # Now extract parts for building
-    parts = parent_content.split()
     country = ""
     division = ""
     dept = ""  # IT, HR, etc.
@@ -185,22 +218,13 @@ def build_lvl2_name(parent_offering, sr_or_im, app, schedule_suffix, service_typ
     final_name = " ".join(name_parts)
     return ensure_incident_naming(final_name)
 
+@functools.lru_cache(maxsize=16384)
 def build_corp_it_name(parent_offering, sr_or_im, app, schedule_suffix, receiver, delivering_tag):
     """Build name for CORP IT offerings"""
     parent_content = extract_parent_info(parent_offering)
     catalog_name = extract_catalog_name(parent_offering)
     
-    # Extract parts from parent content
-    parts = parent_content.split()
-    country = ""
-    topic = ""
-    
-    for part in parts:
-        if len(part) == 2 and part.isupper() and part not in ["HS", "DS"]:
-            country = part
-        elif part not in ["HS", "DS", "Parent", "RecP"] and not (len(part) == 2 and part.isupper()):
-            topic = part
-            break
+    country, topic = get_country_and_topic(parent_content)
     
     # Build CORP IT name - always ends with IT
     prefix_parts = [sr_or_im]
@@ -209,15 +233,7 @@ def build_corp_it_name(parent_offering, sr_or_im, app, schedule_suffix, receiver
     division, country_code = get_division_and_country(parent_content, country, delivering_tag)
     
     # Add delivering tag parts (who delivers the service - from user input)
-    if delivering_tag:
-        delivering_parts = delivering_tag.split()
-        # For MD/UA/RO/TR, override with DS
-        if country in ["UA", "MD", "RO", "TR"]:
-            prefix_parts.extend(["DS", country])
-        else:
-            prefix_parts.extend(delivering_parts)
-    else:
-        prefix_parts.extend([division, country])
+    prefix_parts.extend(get_delivering_prefix(delivering_tag, country, division))
     
     prefix_parts.append("CORP")
     
@@ -253,22 +269,13 @@ def build_corp_it_name(parent_offering, sr_or_im, app, schedule_suffix, receiver
     final_name = " ".join(name_parts)
     return ensure_incident_naming(final_name)
 
+@functools.lru_cache(maxsize=16384)
 def build_corp_dedicated_name(parent_offering, sr_or_im, app, schedule_suffix, receiver, delivering_tag):
     """Build name for CORP Dedicated Services offerings"""
     parent_content = extract_parent_info(parent_offering)
     catalog_name = extract_catalog_name(parent_offering)
     
-    # Extract parts from parent content
-    parts = parent_content.split()
-    country = ""
-    topic = ""
-    
-    for part in parts:
-        if len(part) == 2 and part.isupper() and part not in ["HS", "DS"]:
-            country = part
-        elif part not in ["HS", "DS", "Parent", "RecP"] and not (len(part) == 2 and part.isupper()):
-            topic = part
-            break
+    country, topic = get_country_and_topic(parent_content)
     
     # Build CORP Dedicated Services name
     prefix_parts = [sr_or_im]
@@ -277,15 +284,7 @@ def build_corp_dedicated_name(parent_offering, sr_or_im, app, schedule_suffix, r
     division, country_code = get_division_and_country(parent_content, country, delivering_tag)
     
     # Add delivering tag parts (who delivers the service - from user input)
-    if delivering_tag:
-        delivering_parts = delivering_tag.split()
-        # For MD/UA/RO/TR, override with DS
-        if country in ["UA", "MD", "RO", "TR"]:
-            prefix_parts.extend(["DS", country])
-        else:
-            prefix_parts.extend(delivering_parts)
-    else:
-        prefix_parts.extend([division, country])
+    prefix_parts.extend(get_delivering_prefix(delivering_tag, country, division))
     
     prefix_parts.append("CORP")
     
@@ -313,6 +312,7 @@ def build_corp_dedicated_name(parent_offering, sr_or_im, app, schedule_suffix, r
     final_name = " ".join(name_parts)
     return ensure_incident_naming(final_name)
 
+@functools.lru_cache(maxsize=16384)
 def build_recp_name(parent_offering, sr_or_im, app, schedule_suffix, receiver, delivering_tag):
     """Build name for RecP offerings"""
     parent_content = extract_parent_info(parent_offering)
@@ -320,15 +320,7 @@ def build_recp_name(parent_offering, sr_or_im, app, schedule_suffix, receiver, d
     
     # Extract parts from parent content
     parts = parent_content.split()
-    country = ""
-    topic = ""
-    
-    for part in parts:
-        if len(part) == 2 and part.isupper() and part not in ["HS", "DS"]:
-            country = part
-        elif part not in ["HS", "DS", "Parent", "RecP"] and not (len(part) == 2 and part.isupper()):
-            topic = part
-            break
+    country, topic = get_country_and_topic(parent_content)
     
     # Build RecP name - always ends with IT
     prefix_parts = [sr_or_im]
@@ -397,6 +389,7 @@ def build_recp_name(parent_offering, sr_or_im, app, schedule_suffix, receiver, d
     final_name = " ".join(name_parts)
     return ensure_incident_naming(final_name)
 
+@functools.lru_cache(maxsize=16384)
 def build_standard_name(parent_offering, sr_or_im, app, schedule_suffix, special_dept=None, receiver=None, add_prod=True):
     """Build standard name when not CORP"""
     parent_content = extract_parent_info(parent_offering)
@@ -413,27 +406,23 @@ def build_standard_name(parent_offering, sr_or_im, app, schedule_suffix, special
             country = part
             break
     
-    # Check if catalog name, parent offering, or parent content contains keywords that exclude "Prod"
-    no_prod_keywords = ["hardware", "mailbox", "network", "mobile", "security"]
-    parent_lower = parent_offering.lower()
-    catalog_lower = catalog_name.lower()
-    parent_content_lower = parent_content.lower()
-    exclude_prod = any(keyword in parent_lower or keyword in catalog_lower or keyword in parent_content_lower 
-                      for keyword in no_prod_keywords)
+    # Check if the parent offering contains keywords that exclude "Prod" - parent content and
+    # catalog name are both parts of it, so one search covers all three
+    exclude_prod = NO_PROD_RE.search(parent_offering.lower()) is not None
     
     if special_dept == "Medical":
         # Extract division and country from parent content
-        parts = parent_content.split()
         division = ""
         country = ""
         topic_parts = []
         
-        for i, part in enumerate(parts):
+        for part in parts:
             if part in ["HS", "DS"]:
                 division = part
-            elif len(part) == 2 and part.isupper() and part not in ["IT", "HR"]:
-                country = part
-            elif part not in ["HS", "DS"] and not (len(part) == 2 and part.isupper()):
+            elif len(part) == 2 and part.isupper():
+                if part not in ["IT", "HR"]:
+                    country = part
+            else:
                 topic_parts.append(part)
         
         topic = " ".join(topic_parts) if topic_parts else "Software"
@@ -458,7 +447,6 @@ def build_standard_name(parent_offering, sr_or_im, app, schedule_suffix, special
     
     elif special_dept == "DAK":
         # Replace DAK with Business Services - NO PROD
-        parts = parent_content.split()
         division = ""
         country = ""
         
@@ -521,33 +509,32 @@ def build_standard_name(parent_offering, sr_or_im, app, schedule_suffix, special
     
     elif special_dept == "IT":
         # IT - special handling
-        parts = parent_content.split()
         division = ""
         country = ""
         topic = ""
         
-        # Find division, country and topic
+        # Find division, country and topic in one pass
         topic_parts = []
-        for i, part in enumerate(parts):
+        for part in parts:
             if part in ["HS", "DS"]:
                 division = part
-            elif len(part) == 2 and part.isupper() and part not in ["IT", "HR"]:
-                country = part
-            else:
+            elif len(part) == 2 and part.isupper():
+                if part not in ["IT", "HR"]:
+                    country = part
+            elif part != "RecP":
                 # Collect all remaining words as topic (e.g., "Security & Privacy", "Hardware", etc.)
-                if part not in ["HS", "DS", "RecP"] and not (len(part) == 2 and part.isupper()):
-                    topic_parts.append(part)
+                topic_parts.append(part)
         
         # Join all topic parts to get the full topic phrase
         topic = " ".join(topic_parts) if topic_parts else ""
         
         # If no topic found, use the first significant word from catalog name
         if not topic:
-            catalog_words = catalog_name.split()
-            for word in catalog_words:
-                if word.lower() not in ["the", "a", "an", "and", "or", "for", "of", "in", "on", "to"]:
-                    topic = word
-                    break
+            topic = next(
+                (word for word in catalog_name.split()
+                 if word.lower() not in ["the", "a", "an", "and", "or", "for", "of", "in", "on", "to"]),
+                ""
+            )
         
         prefix_parts = [sr_or_im]
         
@@ -599,8 +586,7 @@ def build_standard_name(parent_offering, sr_or_im, app, schedule_suffix, special
             name_parts.append("solving")
         
         # Check if topic contains any no-prod keywords
-        topic_lower = topic.lower() if topic else ""
-        topic_exclude_prod = any(keyword in topic_lower for keyword in no_prod_keywords)
+        topic_exclude_prod = NO_PROD_RE.search(topic.lower()) is not None
         
         # Only add Prod if user wants it AND no hardware/mailbox/network/mobile/security keywords in any source
         if add_prod and not exclude_prod and not topic_exclude_prod:
@@ -614,7 +600,6 @@ def build_standard_name(parent_offering, sr_or_im, app, schedule_suffix, special
     
     else:
         # Standard case - replace Parent with SR/IM and add IT for RecP entries
-        parts = parent_content.split()
         division = ""
         country_code = ""
         dept = ""
@@ -662,8 +647,7 @@ def build_standard_name(parent_offering, sr_or_im, app, schedule_suffix, special
         final_parts = [prefix, catalog_name]
         
         # Check if we should add Prod
-        catalog_lower = catalog_name.lower()
-        exclude_prod = any(keyword in catalog_lower for keyword in ["hardware", "mailbox", "network", "mobile", "security"])
+        exclude_prod = NO_PROD_RE.search(catalog_name.lower()) is not None
         
         # Add app if provided
         if app:
@@ -692,6 +676,7 @@ def build_standard_name(parent_offering, sr_or_im, app, schedule_suffix, special
         final_name = " ".join(final_parts)
         return ensure_incident_naming(final_name)
 
+@functools.lru_cache(maxsize=16384)
 def build_corp_name(parent_offering, sr_or_im, app, schedule_suffix, receiver, delivering_tag):
     """Build name for CORP offerings"""
     parent_content = extract_parent_info(parent_offering)
@@ -745,38 +730,19 @@ def build_corp_name(parent_offering, sr_or_im, app, schedule_suffix, receiver, d
     
     return ensure_incident_naming(final_name)
 
+@functools.lru_cache(maxsize=16384)
 def build_dedicated_name(parent_offering, sr_or_im, app, schedule_suffix, receiver, delivering_tag, add_prod=True):
     """Build name for Dedicated Services offerings (without CORP)"""
     parent_content = extract_parent_info(parent_offering)
     catalog_name = extract_catalog_name(parent_offering)
     
-    # Check for forbidden keywords that should never have "Prod"
-    no_prod_keywords = ["hardware", "mailbox", "network", "mobile", "security", "onboarding", "offboarding", "generic request", "restore from backup", "change employee information"]
-    parent_lower = parent_offering.lower()
-    catalog_lower = catalog_name.lower()
-    parent_content_lower = parent_content.lower()
-    exclude_prod = any(keyword in parent_lower or keyword in catalog_lower or keyword in parent_content_lower 
-                      for keyword in no_prod_keywords)
+    # Check for forbidden keywords that should never have "Prod" (parent content and catalog name are part of the parent offering)
+    exclude_prod = DEDICATED_NO_PROD_RE.search(parent_offering.lower()) is not None
     
-    parts = parent_content.split()
-    country = ""
-    topic = ""
-    for part in parts:
-        if len(part) == 2 and part.isupper() and part not in ["HS", "DS"]:
-            country = part
-        elif part not in ["HS", "DS", "Parent", "RecP"] and not (len(part) == 2 and part.isupper()):
-            topic = part
-            break
+    country, topic = get_country_and_topic(parent_content)
     prefix_parts = [sr_or_im]
     division, country_code = get_division_and_country(parent_content, country, delivering_tag)
-    if delivering_tag:
-        delivering_parts = delivering_tag.split()
-        if country in ["UA", "MD", "RO", "TR"]:
-            prefix_parts.extend(["DS", country])
-        else:
-            prefix_parts.extend(delivering_parts)
-    else:
-        prefix_parts.extend([division, country])
+    prefix_parts.extend(get_delivering_prefix(delivering_tag, country, division))
     # NO CORP here!
     prefix_parts.append("Dedicated Services")
     name_prefix = f"[{' '.join(prefix_parts)}]"
@@ -796,24 +762,20 @@ def commit_block(cc, schedule_suffix, rsp_duration, rsl_duration, sr_or_im):
     """Create commitment block with OLA for all countries"""
     if sr_or_im == "IM":
         # For IM, no OLA
-        lines = [
-            f"[{cc}] SLA IM RSP {schedule_suffix} P1-P4 {rsp_duration}",
+        return (
+            f"[{cc}] SLA IM RSP {schedule_suffix} P1-P4 {rsp_duration}\n"
             f"[{cc}] SLA IM RSL {schedule_suffix} P1-P4 {rsl_duration}"
-        ]
-    else:
-        # For SR, include OLA (but only once)
-        lines = [
-            f"[{cc}] SLA SR RSP {schedule_suffix} P1-P4 {rsp_duration}",
-            f"[{cc}] SLA SR RSL {schedule_suffix} P1-P4 {rsl_duration}",
-            f"[{cc}] OLA SR RSL {schedule_suffix} P1-P4 {rsl_duration}"
-        ]
-    return "\n".join(lines)
+        )
+    # For SR, include OLA (but only once)
+    return (
+        f"[{cc}] SLA SR RSP {schedule_suffix} P1-P4 {rsp_duration}\n"
+        f"[{cc}] SLA SR RSL {schedule_suffix} P1-P4 {rsl_duration}\n"
+        f"[{cc}] OLA SR RSL {schedule_suffix} P1-P4 {rsl_duration}"
+    )
 
 def update_commitments(orig, sched, rsp, rsl, sr_or_im, country):
-    """Update existing commitments and ensure OLA is present"""
+    """Update the schedule and duration of the existing RSP, RSL and OLA commitment lines"""
     out = []
-    has_ola = False
-    country_code = None
     
     for line in str(orig).splitlines():
         line = line.strip()
@@ -821,31 +783,19 @@ def update_commitments(orig, sched, rsp, rsl, sr_or_im, country):
             continue
             
         if "RSP" in line:
-            # Extract country code from line like [PL] SLA SR RSP...
-            match = re.search(r'\[(\w+)\]', line)
-            if match:
-                country_code = match.group(1)
-            # Extract P values (P1-P4, P1-P3, etc)
-            p_match = re.search(r'(P\d+-P\d+)', line)
-            p_values = p_match.group(1) if p_match else "P1-P4"
-            # Update schedule and duration
-            line = re.sub(r"RSP\s+[^P]+", f"RSP {sched} ", line)
-            line = re.sub(r"(P\d+-P\d+)\s+.*$", f"{p_values} {rsp}", line)
-        elif "RSL" in line:
-            # Extract P values
-            p_match = re.search(r'(P\d+-P\d+)', line)
-            p_values = p_match.group(1) if p_match else "P1-P4"
-            # Update schedule and duration
-            line = re.sub(r"RSL\s+[^P]+", f"RSL {sched} ", line)
-            line = re.sub(r"(P\d+-P\d+)\s+.*$", f"{p_values} {rsl}", line)
-        elif "OLA" in line:
-            has_ola = True
-            # Extract P values
-            p_match = re.search(r'(P\d+-P\d+)', line)
-            p_values = p_match.group(1) if p_match else "P1-P4"
-            # Update schedule and duration - OLA uses same pattern as RSL
-            line = re.sub(r"RSL\s+[^P]+", f"RSL {sched} ", line)
-            line = re.sub(r"(P\d+-P\d+)\s+.*$", f"{p_values} {rsl}", line)
+            schedule_re, kind, duration = RSP_SCHEDULE_RE, "RSP", rsp
+        elif "RSL" in line or "OLA" in line:
+            # OLA lines use the same pattern and duration as RSL
+            schedule_re, kind, duration = RSL_SCHEDULE_RE, "RSL", rsl
+        else:
+            out.append(line)
+            continue
+        # Extract P values (P1-P4, P1-P3, etc)
+        p_match = PRIORITY_RANGE_RE.search(line)
+        p_values = p_match.group(1) if p_match else "P1-P4"
+        # Update schedule and duration
+        line = schedule_re.sub(f"{kind} {sched} ", line)
+        line = PRIORITY_TAIL_RE.sub(f"{p_values} {duration}", line)
         out.append(line)
     
     return "\n".join(out)
@@ -864,32 +814,39 @@ def custom_commit_block(cc, sr_or_im, rsp_enabled, rsl_enabled, rsp_schedule, rs
         if sr_or_im == "SR":
             lines.append(f"[{cc}] OLA {sr_or_im} RSL {rsl_schedule} {rsl_priority} {rsl_time}")
     
-    return "\n".join(lines) if lines else ""
+    return "\n".join(lines)
+
+# Columns of a row created for a new parent - the fields left empty are filled in during processing
+NEW_PARENT_ROW_TEMPLATE = {
+    "Name (Child Service Offering lvl 1)": "",
+    "Parent Offering": "",
+    "Parent": "",
+    "Service Offerings | Depend On (Application Service)": "",
+    "Service Commitments": "",
+    "Delivery Manager": "",
+    "Subscribed by Location": "",
+    "Phase": "Catalog",
+    "Status": "Operational",
+    "Life Cycle Stage": "Operational",
+    "Life Cycle Status": "In Use",
+    "Support group": "",
+    "Managed by Group": "",
+    "Subscribed by Company": "",  # Set based on receiver and CORP type
+    "Business Criticality": "",
+    "Record view": "",  # Set based on SR/IM
+    "Approval required": "",
+    "Approval group": "",
+}
+NEW_PARENT_ROW_INDEX = pd.Index(NEW_PARENT_ROW_TEMPLATE)
 
 def create_new_parent_row(new_parent_offering, new_parent, country, business_criticality="", approval_required=False, approval_required_value="empty", change_subscribed_location=False, custom_subscribed_location="Global"):
     """Create a new row with the specified parent offering and parent values"""
-    # Create a basic row structure with required columns
-    new_row = {
-        "Name (Child Service Offering lvl 1)": "",  # Will be filled later
-        "Parent Offering": new_parent_offering,  # Use the user-provided value
-        "Parent": new_parent,  # Use the user-provided value (not hardcoded)
-        "Service Offerings | Depend On (Application Service)": "",
-        "Service Commitments": "",
-        "Delivery Manager": "",
-        "Subscribed by Location": "",  # Will be set below
-        "Phase": "Catalog",
-        "Status": "Operational",
-        "Life Cycle Stage": "Operational",
-        "Life Cycle Status": "In Use",
-        "Support group": "",
-        "Managed by Group": "",
-        "Subscribed by Company": "",  # Will be set during processing based on receiver and CORP type
-        "Business Criticality": business_criticality,
-        "Record view": "",  # Will be set based on SR/IM
-        "Approval required": "true" if approval_required else "false",  # Always use "true"/"false"
-        "Approval group": approval_required_value if approval_required else "empty"  # Use custom value for approval group
-        # Removed "Visibility group" line
-    }
+    new_row = NEW_PARENT_ROW_TEMPLATE.copy()
+    new_row["Parent Offering"] = new_parent_offering  # Use the user-provided value
+    new_row["Parent"] = new_parent  # Use the user-provided value (not hardcoded)
+    new_row["Business Criticality"] = business_criticality
+    new_row["Approval required"] = "true" if approval_required else "false"  # Always use "true"/"false"
+    new_row["Approval group"] = approval_required_value if approval_required else "empty"  # Use custom value for approval group
     
     # Set Subscribed by Location based on user choice
     if change_subscribed_location:
@@ -897,7 +854,8 @@ def create_new_parent_row(new_parent_offering, new_parent, country, business_cri
     else:
         new_row["Subscribed by Location"] = "Global"
     
-    return pd.Series(new_row)
+    # Built on the shared index - the template keeps the columns in its order
+    return pd.Series(list(new_row.values()), index=NEW_PARENT_ROW_INDEX)
 
 def get_support_group_for_country(country, support_group, support_groups_per_country, division=None):
     """Get the appropriate support group for a given country and division"""
@@ -974,37 +932,46 @@ def get_schedule_suffixes_for_country(country, receiver, schedule_settings_per_c
         key = country  # e.g., "DE", "MD", "UA", "CY", "RO", "TR"
     
     # Check if there are custom schedules for this country/receiver
+    # (run_generator has already split them into lists)
     if key in schedule_settings_per_country:
         custom_schedules = schedule_settings_per_country[key]
         if isinstance(custom_schedules, str):
-            # Split on newlines if it's a string
-            return [s.strip() for s in custom_schedules.split('\n') if s.strip()]
+            return split_schedule_lines(custom_schedules)
         elif isinstance(custom_schedules, list):
             return custom_schedules
     
     # Fallback to default schedule suffixes
     return default_schedule_suffixes
 
+def split_schedule_lines(schedules):
+    """Non-empty, stripped lines of a multiline schedule text"""
+    return [s.strip() for s in schedules.split('\n') if s.strip()]
+
+# DE support groups with a fixed Subscribed by Company and LDAP:
+# (support group fragment, receiver, (company, LDAP)) - the first matching fragment wins
+DE_SPECIAL_SUPPORT_GROUPS = (
+    ("HS DE IT Service Desk HC", "HS DE", ("DE Internal Patients", "CALDOM1.DE [Hospital Calbe]")),
+    ("HS DE IT Service Desk - MCC", "HS DE", ("DE External Patients", "mednet-de.world [Medicover Clinics]")),
+    ("DS DE IT Service Desk -Labs", "DS DE", ("DE IFLB Laboratories\nDE IMD Laboratories", "imd-labore.intern [General]")),
+    ("DS DE IT Service Desk - Labs", "DS DE", ("DE IFLB Laboratories\nDE IMD Laboratories", "imd-labore.intern [General]")),
+)
+
 def get_de_company_and_ldap(support_group, receiver, original_row=None):
     """Get the Subscribed by Company and LDAP values for DE based on support group"""
     # Normalize the support group name for comparison (remove extra spaces, normalize case)
     normalized_sg = ' '.join(support_group.strip().split()) if support_group else ""
     
     # Special mappings for DE support groups - using normalized comparison
-    if "HS DE IT Service Desk HC" in normalized_sg and receiver == "HS DE":
-        return "DE Internal Patients", "CALDOM1.DE [Hospital Calbe]"
-    elif "HS DE IT Service Desk - MCC" in normalized_sg and receiver == "HS DE":
-        return "DE External Patients", "mednet-de.world [Medicover Clinics]"
-    elif ("DS DE IT Service Desk -Labs" in normalized_sg or "DS DE IT Service Desk - Labs" in normalized_sg) and receiver == "DS DE":
-        return "DE IFLB Laboratories\nDE IMD Laboratories", "imd-labore.intern [General]"
-    else:
-        # For other support groups, return the original "Subscribed by Company" value if available
-        if original_row is not None and "Subscribed by Company" in original_row.index:
-            original_company = str(original_row["Subscribed by Company"]).strip()
-            if original_company and original_company not in ["nan", "NaN", "", "None"]:
-                return original_company, ""
-        # Fallback to support group name if no original value available
-        return support_group, ""
+    for fragment, fragment_receiver, company_and_ldap in DE_SPECIAL_SUPPORT_GROUPS:
+        if receiver == fragment_receiver and fragment in normalized_sg:
+            return company_and_ldap
+    # For other support groups, return the original "Subscribed by Company" value if available
+    if original_row is not None and "Subscribed by Company" in original_row.index:
+        original_company = str(original_row["Subscribed by Company"]).strip()
+        if original_company and original_company not in ["nan", "NaN", "", "None"]:
+            return original_company, ""
+    # Fallback to support group name if no original value available
+    return support_group, ""
 
 PLURAL_MAP = {
     "Laptop": "Laptops",
@@ -1042,6 +1009,8 @@ PLURAL_MAP = {
     "Cable": "Cables",
     "Adapter": "Adapters"
 }
+# Lowercase lookup for case-insensitive matches (the first entry wins, as with the old linear scan)
+PLURAL_MAP_LOWER = {singular.lower(): plural for singular, plural in reversed(PLURAL_MAP.items())}
 
 def get_plural_form(word):
     """Get plural form of a word if it exists in PLURAL_MAP, otherwise return original"""
@@ -1052,13 +1021,119 @@ def get_plural_form(word):
     if word in PLURAL_MAP:
         return PLURAL_MAP[word]
     
-    # Check case-insensitive match
-    for singular, plural in PLURAL_MAP.items():
-        if word.lower() == singular.lower():
-            return plural
-    
-    # If not found, return original word
-    return word
+    # Check case-insensitive match, otherwise return original word
+    return PLURAL_MAP_LOWER.get(word.lower(), word)
+
+def parse_keywords(keyword_string):
+    """Parse keywords - returns (keywords_list, use_and_logic)"""
+    if not keyword_string.strip():
+        return [], False
+    
+    # Comma separated keywords use AND logic, line separated ones OR logic
+    use_and = ',' in keyword_string
+    keywords = []
+    for k in keyword_string.split(',' if use_and else '\n'):
+        k = k.strip()
+        if k:
+            # Remove quotes if present
+            if k.startswith('"') and k.endswith('"'):
+                k = k[1:-1]
+            keywords.append(k)
+    return keywords, use_and
+
+def keyword_mask(values, keywords, use_and):
+    """Vectorized keyword match over a lowercased string Series - all (AND) or any (OR) keyword as substring"""
+    if not use_and:
+        # One pass with an alternation of the escaped keywords instead of one pass per keyword
+        return values.str.contains("|".join(re.escape(k) for k in keywords), na=False)
+    matches = [values.str.contains(k, regex=False, na=False) for k in keywords]
+    return functools.reduce(operator.and_, matches)
+
+@functools.lru_cache(maxsize=64)
+def receiver_word_re(recv):
+    """Case-insensitive whole-word pattern for a receiver tag such as "DS DE", compiled once per receiver"""
+    return re.compile(rf"\b{re.escape(recv)}\b", re.IGNORECASE)
+
+def read_source_workbook(source, use_lvl2=True):
+    """
+    Read the Child SO sheets of one source workbook (path or file-like) into DataFrames.
+    Without use_lvl2 only the names are read from the lvl2 sheet - they are still
+    needed for duplicate detection, the other lvl2 columns are never used.
+    The record "Number" column is never read - it is always left out of the output.
+    """
+    frames = {}
+    with pd.ExcelFile(source, engine=EXCEL_READ_ENGINE) as excel_file:
+        for sheet_name in SOURCE_SHEETS:
+            if sheet_name not in excel_file.sheet_names:
+                continue
+            usecols = lambda col: col != "Number"
+            if sheet_name == "Child SO lvl2" and not use_lvl2:
+                usecols = lambda col: col == "Name (Child Service Offering lvl 1)"
+            frames[sheet_name] = pd.read_excel(excel_file, sheet_name=sheet_name, usecols=usecols)
+    return frames
+
+def read_in_parallel(read, sources):
+    """
+    Call read on every source and return the results in source order.
+    Several workbooks are read on a thread pool - calamine releases the GIL while
+    unzipping and parsing a sheet, so the files are parsed side by side.
+    """
+    sources = list(sources)
+    if len(sources) < 2:
+        return [read(source) for source in sources]
+    with ThreadPoolExecutor(max_workers=min(SOURCE_READ_WORKERS, len(sources))) as executor:
+        return list(executor.map(read, sources))
+
+def load_source_frames(src_dir, use_lvl2=True):
+    """Read all ALL_Service_Offering_*.xlsx files in src_dir - returns {file stem: {sheet name: DataFrame}}"""
+    workbooks = sorted(src_dir.glob(SOURCE_FILE_PATTERN))
+    frames = read_in_parallel(functools.partial(read_source_workbook, use_lvl2=use_lvl2), workbooks)
+    return {wb.stem: wb_frames for wb, wb_frames in zip(workbooks, frames)}
+
+# Output cell formatting - shared by every cell instead of creating one style object per cell
+WRAP_ALIGNMENT = Alignment(wrap_text=True)
+MISSING_SCHEDULE_FILL = PatternFill(start_color="FFCCCC", end_color="FFCCCC", fill_type="solid")
+EMPTY_CELL_VALUES = {'', 'nan', 'none', 'null', '<na>', 'n/a'}
+
+def write_output_workbook(outfile, sheets, missing_schedule_info):
+    """
+    Write the final sheets to outfile (path or file-like) in openpyxl's write-only mode,
+    so rows are streamed to the file instead of being kept as a cell grid in memory.
+    Every cell wraps text and NULL-like values are left blank; columns are 10-100 characters
+    wide to fit their content, and the names of offerings whose schedule is missing from
+    the source data are highlighted red.
+    """
+    wb = Workbook(write_only=True)
+    for sheet_name, df in sheets.items():
+        ws = wb.create_sheet(sheet_name)
+
+        # Column widths have to be set before the first row is written
+        header_lengths = pd.Series([len(str(col)) if col else 0 for col in df.columns], index=df.columns)
+        max_lengths = df.map(lambda v: len(str(v)) if v else 0).max().combine(header_lengths, max)
+        for col_idx, max_length in enumerate(max_lengths, start=1):
+            ws.column_dimensions[get_column_letter(col_idx)].width = max(10, min(max_length, 100)) + 2
+
+        def make_cell(value, fill=None):
+            if str(value).strip().lower() in EMPTY_CELL_VALUES:
+                value = None  # Use None instead of empty string for Excel
+            cell = WriteOnlyCell(ws, value=value)
+            cell.alignment = WRAP_ALIGNMENT
+            if fill is not None:
+                cell.fill = fill
+            return cell
+
+        name_col_idx = next((idx for idx, col in enumerate(df.columns) if col == "Name (Child Service Offering lvl 1)"), None)
+        missing_rows = set(missing_schedule_info.get(sheet_name, []))
+
+        ws.append([make_cell(col) for col in df.columns])
+        for row_idx, row in enumerate(df.itertuples(index=False, name=None)):
+            red_col_idx = name_col_idx if row_idx in missing_rows else None
+            ws.append([
+                make_cell(value, MISSING_SCHEDULE_FILL if idx == red_col_idx else None)
+                for idx, value in enumerate(row)
+            ])
+
+    wb.save(outfile)
 
 def run_generator(
     keywords_parent, keywords_child, new_apps, schedule_suffixes,
@@ -1089,9 +1164,14 @@ def run_generator(
     change_subscribed_location=False,
     custom_subscribed_location="Global",
     use_pluralization=True,
-    add_prod=True):  # Add this new parameter
+    add_prod=True,
+    source_frames=None):
     """
     Main generator function.
+
+    Source workbooks are read from src_dir unless already parsed ones are passed
+    in source_frames ({file stem: {sheet name: DataFrame}}, see load_source_frames).
+    The passed DataFrames are never modified, so they can be shared between runs.
     """
     # Define helper function for cleaning approval values
     def clean_approval_value(val):
@@ -1115,145 +1195,75 @@ def run_generator(
         managed_by_groups_per_country = {}
     if schedule_settings_per_country is None:
         schedule_settings_per_country = {}
+    # Split multiline schedule texts once here, not for every offering they are looked up for
+    schedule_settings_per_country = {
+        key: split_schedule_lines(schedules) if isinstance(schedules, str) else schedules
+        for key, schedules in schedule_settings_per_country.items()
+        if isinstance(schedules, (str, list))
+    }
     if aliases_per_country is None:
         aliases_per_country = {}
     if selected_languages is None:
         selected_languages = []
+    if source_frames is None:
+        source_frames = load_source_frames(src_dir, use_lvl2)
 
     sheets, seen = {}, set()
     sheets_data = {}  # Store rows as lists for batch concatenation
     existing_offerings = set()  # Track existing offerings to detect duplicates
     original_ldap_data = {}  # Store LDAP data from original files
-    excel_cache = {}  # Cache for Excel file reads
     missing_schedule_info = {}  # Track rows with missing schedules for red formatting
     column_order_cache = {}  # Store original column order from files
 
-    def parse_keywords(keyword_string):
-        """Parse keywords - returns (keywords_list, use_and_logic)"""
-        if not keyword_string.strip():
-            return [], False
-        
-        # Check if it contains commas (AND logic)
-        if ',' in keyword_string:
-            keywords = []
-            for k in keyword_string.split(','):
-                k = k.strip()
-                if k:
-                    # Remove quotes if present
-                    if k.startswith('"') and k.endswith('"'):
-                        k = k[1:-1]
-                    keywords.append(k)
-            return keywords, True
-        else:
-            # Line separated (OR logic)
-            keywords = []
-            for k in keyword_string.split('\n'):
-                k = k.strip()
-                if k:
-                    # Remove quotes if present
-                    if k.startswith('"') and k.endswith('"'):
-                        k = k[1:-1]
-                    keywords.append(k)
-            return keywords, False
-
-    def row_keywords_ok(row):
-        # Parse parent keywords
-        parent_keywords, parent_use_and = parse_keywords(keywords_parent)
-        
-        # STEP 1: Check parent offering FIRST (if parent keywords provided)
+    # Keyword filters are parsed once per run and applied column-wise below
+    parent_keywords, parent_use_and = parse_keywords(keywords_parent)
+    child_keywords, child_use_and = parse_keywords(keywords_child)
+    excluded_keywords, excluded_use_and = parse_keywords(keywords_excluded)
+    # Lowercased once here; the masks compare against lowercased columns
+    parent_keywords_lower = [k.lower().strip() for k in parent_keywords]
+    child_keywords_lower = [k.lower().strip() for k in child_keywords]
+    excluded_keywords_lower = [k.lower() for k in excluded_keywords]
+
+    def keywords_mask(df):
+        """Parent offering must match the parent keywords, then child name the child keywords"""
+        mask = pd.Series(True, index=df.index)
         if parent_keywords:
-            p = str(row["Parent Offering"]).lower()
-            # Remove extra spaces and normalize
-            p = ' '.join(p.split())
-            
-            if parent_use_and:
-                # AND logic - all parent keywords must match
-                for k in parent_keywords:
-                    k_lower = k.lower().strip()
-                    if k_lower not in p:
-                        return False  # FAIL if parent doesn't match
-            else:
-                # OR logic - any parent keyword must match
-                found = False
-                for k in parent_keywords:
-                    k_lower = k.lower().strip()
-                    if k_lower in p:
-                        found = True
-                        break
-                if not found:
-                    return False  # FAIL if parent doesn't match
-
-        # STEP 2: If parent passed (or no parent keywords), check child name
-        child_keywords, child_use_and = parse_keywords(keywords_child)
-        
+            p = df["Parent Offering"].map(str).str.lower().str.split().str.join(" ")
+            mask &= keyword_mask(p, parent_keywords_lower, parent_use_and)
         if child_keywords:
-            n = str(row["Name (Child Service Offering lvl 1)"]).lower()
-            # Remove extra spaces and normalize
-            n = ' '.join(n.split())
-            
-            if child_use_and:
-                # AND logic - all child keywords must match
-                for k in child_keywords:
-                    k_lower = k.lower().strip()
-                    if k_lower not in n:
-                        return False  # FAIL if child doesn't match
-            else:
-                # OR logic - any child keyword must match
-                found = False
-                for k in child_keywords:
-                    k_lower = k.lower().strip()
-                    if k_lower in n:
-                        found = True
-                        break
-                if not found:
-                    return False  # FAIL if child doesn't match
-
-        # STEP 3: Both passed (or no keywords provided)
-        return True
-
-    def row_excluded_keywords_ok(row):
-        """Check if row should be excluded based on excluded keywords"""
-        # Parse excluded keywords
-        excluded_keywords, excluded_use_and = parse_keywords(keywords_excluded)
-        
-        if not excluded_keywords:
-            return True  # No excluded keywords, so row is OK
-        
-        # Check both parent offering and child name for excluded keywords
-        p = str(row["Parent Offering"]).lower()
-        n = str(row["Name (Child Service Offering lvl 1)"]).lower()
-        
-        if excluded_use_and:
-            # AND logic - if ALL excluded keywords are found, exclude the row
-            parent_has_all = all(k.lower() in p for k in excluded_keywords)
-            child_has_all = all(k.lower() in n for k in excluded_keywords)
-            # Exclude if either parent or child has all excluded keywords
-            if parent_has_all or child_has_all:
-                return False
-        else:
-            # OR logic - if ANY excluded keyword is found, exclude the row
-            parent_has_any = any(k.lower() in p for k in excluded_keywords)
-            child_has_any = any(k.lower() in n for k in excluded_keywords)
-            # Exclude if either parent or child has any excluded keyword
-            if parent_has_any or child_has_any:
-                return False
-            
-        return True  # Row is OK (not excluded)
-
-    def lc_ok(row):
-        return all(str(row[c]).strip().lower() not in discard_lc
-                   for c in ("Phase", "Status", "Life Cycle Stage", "Life Cycle Status"))
+            n = df["Name (Child Service Offering lvl 1)"].map(str).str.lower().str.split().str.join(" ")
+            mask &= keyword_mask(n, child_keywords_lower, child_use_and)
+        return mask
 
-    def name_prefix_ok(name):
-        # Make prefix check case-insensitive and handle extra spaces
-        name = name.strip()
-        # Check if name starts with [SR or [IM (case-insensitive)
-        return name.upper().startswith(f"[{sr_or_im.upper()} ") or name.upper().startswith(f"[{sr_or_im.upper()}\t")
+    def excluded_keywords_mask(df):
+        """False for rows whose parent offering or child name hits the excluded keywords"""
+        if not excluded_keywords:
+            return pd.Series(True, index=df.index)
+        p = df["Parent Offering"].map(str).str.lower()
+        n = df["Name (Child Service Offering lvl 1)"].map(str).str.lower()
+        return ~(keyword_mask(p, excluded_keywords_lower, excluded_use_and)
+                 | keyword_mask(n, excluded_keywords_lower, excluded_use_and))
+
+    def lc_mask(df):
+        """False for rows retired/retiring etc. in any life cycle column"""
+        mask = pd.Series(True, index=df.index)
+        for c in ("Phase", "Status", "Life Cycle Stage", "Life Cycle Status"):
+            # Few distinct values per column, so normalize those once and map back
+            values = df[c].map(str)
+            unique_values = values.unique()
+            discarded = {v for v in unique_values if v.strip().lower() in discard_lc}
+            mask &= ~values.isin(discarded)
+        return mask
+
+    def name_prefix_mask(df):
+        # Names starting with [SR or [IM (case-insensitive, ignoring surrounding spaces)
+        names = df["Name (Child Service Offering lvl 1)"].astype(str).str.strip().str.upper()
+        return names.str.startswith((f"[{sr_or_im.upper()} ", f"[{sr_or_im.upper()}\t"), na=False)
 
     # Process apps - split on comma, newline, or semicolon
     all_apps = []
     for raw in new_apps:
-        for app in re.split(r'[,\n;]+', str(raw)):
+        for app in APP_SEPARATOR_RE.split(str(raw)):
             app = app.strip()
             if app:
                 all_apps.append(app)
@@ -1274,21 +1284,16 @@ def run_generator(
         special_dept = "DAK"
 
     # First, collect all existing offerings, LDAP data, and column order from the source files
-    for wb in src_dir.glob("ALL_Service_Offering_*.xlsx"):
+    for file_stem, source_sheets in source_frames.items():
         try:
-            # Cache Excel file to avoid multiple reads
-            if wb not in excel_cache:
-                excel_cache[wb] = pd.ExcelFile(wb)
-            excel_file = excel_cache[wb]
-            
             # Check BOTH sheets for existing offerings and column order
-            for sheet_name in ["Child SO lvl1", "Child SO lvl2"]:
+            for sheet_name in SOURCE_SHEETS:
                 try:
-                    if sheet_name in excel_file.sheet_names:
-                        df = pd.read_excel(excel_file, sheet_name=sheet_name)
+                    if sheet_name in source_sheets:
+                        df = source_sheets[sheet_name]
                         
                         # Store column order
-                        country = wb.stem.split("_")[-1].upper()
+                        country = file_stem.split("_")[-1].upper()
                         column_key = f"{country}_{sheet_name}"
                         if column_key not in column_order_cache:
                             column_order_cache[column_key] = list(df.columns)
@@ -1296,25 +1301,24 @@ def run_generator(
                         if "Name (Child Service Offering lvl 1)" in df.columns:
                             # Clean and normalize the names before adding to set
                             existing_names = df["Name (Child Service Offering lvl 1)"].dropna().astype(str)
-                            normalized_names = existing_names.apply(lambda x: ' '.join(str(x).split()))
-                            existing_offerings.update(normalized_names)
+                            normalized_names = existing_names.str.split().str.join(" ")
+                            existing_offerings.update(normalized_names.tolist())
                         
                         # Collect LDAP data for DE
-                        if wb.stem.endswith("_DE") and "Support group" in df.columns:
+                        if file_stem.endswith("_DE") and "Support group" in df.columns:
                             # Look for LDAP columns
                             ldap_cols = [col for col in df.columns if "LDAP" in col.upper() or "Ldap" in col or "ldap" in col]
-                            if ldap_cols and "Support group" in df.columns:
-                                for idx, row in df.iterrows():
-                                    sg = str(row.get("Support group", "")).strip()
-                                    if sg and sg not in ["nan", "NaN", ""]:
-                                        # Store all LDAP values for this support group
-                                        ldap_values = {}
-                                        for ldap_col in ldap_cols:
-                                            ldap_val = str(row.get(ldap_col, "")).strip()
-                                            if ldap_val and ldap_val not in ["nan", "NaN", "", "None", "none"]:
-                                                ldap_values[ldap_col] = ldap_val
-                                        if ldap_values:
-                                            original_ldap_data[sg] = ldap_values
+                            if ldap_cols and not df.empty:
+                                support_groups = df["Support group"].map(str).str.strip()
+                                ldap_values = df[ldap_cols].apply(lambda col: col.map(str).str.strip())
+                                valid = ~ldap_values.isin(["nan", "NaN", "", "None", "none"])
+                                # Each support group keeps the LDAP values of its last row that has any
+                                rows = ~support_groups.isin(["nan", "NaN", ""]) & valid.any(axis=1)
+                                rows &= ~support_groups.where(rows).duplicated(keep="last")
+                                for sg, values, keep in zip(support_groups[rows],
+                                                            ldap_values[rows].itertuples(index=False),
+                                                            valid[rows].itertuples(index=False)):
+                                    original_ldap_data[sg] = {col: v for col, v, ok in zip(ldap_cols, values, keep) if ok}
                 except Exception:
                     # Skip if sheet doesn't exist
                     continue
@@ -1323,13 +1327,13 @@ def run_generator(
             continue
 
     # Process the files
-    total_files = len(list(src_dir.glob("ALL_Service_Offering_*.xlsx")))
+    total_files = len(source_frames)
     processed_files = 0
 
-    for wb in src_dir.glob("ALL_Service_Offering_*.xlsx"):
+    for file_stem, source_sheets in source_frames.items():
         processed_files += 1
-        country = wb.stem.split("_")[-1].upper()
-        print(f"Processing file {processed_files}/{total_files}: {wb.name}")
+        country = file_stem.split("_")[-1].upper()
+        print(f"Processing file {processed_files}/{total_files}: {file_stem}")
         
         # Process BOTH lvl1 and lvl2 sheets when use_lvl2 is True
         # Process only lvl1 when use_lvl2 is False
@@ -1362,18 +1366,13 @@ def run_generator(
                     
                     # Initialize schedule checking variables
                     all_country_names_for_schedules = pd.Series([], dtype=str)
-                    corp_names_for_schedules = pd.Series([], dtype=str)
-                    non_corp_names_for_schedules = pd.Series([], dtype=str)
+                    schedule_found_by_suffix = {}
                 else:
-                    # ORIGINAL LOGIC - read from cached Excel file
-                    if wb not in excel_cache:
-                        excel_cache[wb] = pd.ExcelFile(wb)
-                    excel_file = excel_cache[wb]
-                    
-                    if sheet_name not in excel_file.sheet_names:
+                    # ORIGINAL LOGIC - work on a copy of the already parsed sheet
+                    if sheet_name not in source_sheets:
                         continue  # Skip if sheet doesn't exist
                         
-                    df = pd.read_excel(excel_file, sheet_name=sheet_name)
+                    df = source_sheets[sheet_name].copy()
                     
                     # Store the original column order for this sheet
                     column_key = f"{country}_{sheet_name}"
@@ -1384,7 +1383,7 @@ def run_generator(
                     original_columns = list(df.columns)
                     
                     # DEBUG: Print all columns to see what we have
-                    print(f"🔍 **COLUMNS IN {wb.name} - {sheet_name}**:")
+                    print(f"🔍 **COLUMNS IN {file_stem} - {sheet_name}**:")
                     for i, col in enumerate(df.columns):
                         print(f"  {i+1:2d}. '{col}'")
                         if "alias" in col.lower() or "u_label" in col.lower():
@@ -1403,33 +1402,18 @@ def run_generator(
 
                     # Initialize schedule checking variables
                     all_country_names_for_schedules = pd.Series([], dtype=str)
-                    corp_names_for_schedules = pd.Series([], dtype=str)
-                    non_corp_names_for_schedules = pd.Series([], dtype=str)
+                    schedule_found_by_suffix = {}
 
                     # Debug: Check if we have the required columns
                     if "Parent Offering" in df.columns and "Name (Child Service Offering lvl 1)" in df.columns:
                         # Store ALL names from the country file for schedule checking (before any filtering)
-                        all_country_names_for_schedules = df["Name (Child Service Offering lvl 1)"].astype(str).str.upper()
-                        corp_names_for_schedules = all_country_names_for_schedules[all_country_names_for_schedules.str.contains('CORP|DEDICATED|RECP', na=False)]
-                        non_corp_names_for_schedules = all_country_names_for_schedules[~all_country_names_for_schedules.str.contains('CORP|DEDICATED|RECP', na=False)]
+                        all_country_names_for_schedules = df["Name (Child Service Offering lvl 1)"].astype(str).str.upper().str.strip()
                         
                     # Apply pre-filtering with vectorized operations where possible
-                    if keywords_parent.strip():
-                        # Fast pre-filter using vectorized string operations
+                    if parent_keywords:
+                        # Fast pre-filter on the raw parent column to reduce the dataset early
                         parent_col = df["Parent Offering"].astype(str).str.lower()
-                        parent_keywords, parent_use_and = parse_keywords(keywords_parent)
-                        if parent_keywords:
-                            if parent_use_and:
-                                # AND logic - all keywords must be present
-                                parent_mask = parent_col.str.contains('|'.join([re.escape(k.lower()) for k in parent_keywords]), na=False)
-                                # Further filter with apply for exact AND logic
-                                parent_mask = parent_mask & df.apply(row_keywords_ok, axis=1)
-                            else:
-                                # OR logic - any keyword must be present
-                                parent_mask = parent_col.str.contains('|'.join([re.escape(k.lower()) for k in parent_keywords]), na=False)
-                        else:
-                            parent_mask = pd.Series([True] * len(df), index=df.index)
-                        df = df[parent_mask]  # Reduce dataset size early
+                        df = df[keyword_mask(parent_col, parent_keywords_lower, False)]
                     
                     if df.empty:
                         continue
@@ -1440,15 +1424,15 @@ def run_generator(
                     # For Lvl2, different filtering logic
                     if is_lvl2:
                         # For Lvl2, we don't check for SR/IM prefix and handle commitments differently
-                        mask = (df.apply(row_keywords_ok, axis=1)
-                                & df.apply(row_excluded_keywords_ok, axis=1)
-                                & df.apply(lc_ok, axis=1))
+                        mask = (keywords_mask(df)
+                                & excluded_keywords_mask(df)
+                                & lc_mask(df))
                         # Don't filter out entries with empty Service Commitments for Lvl2
                     else:
-                        mask = (df.apply(row_keywords_ok, axis=1)
-                                & df.apply(row_excluded_keywords_ok, axis=1)
-                                & df["Name (Child Service Offering lvl 1)"].astype(str).apply(name_prefix_ok)
-                                & df.apply(lc_ok, axis=1)
+                        mask = (keywords_mask(df)
+                                & excluded_keywords_mask(df)
+                                & name_prefix_mask(df)
+                                & lc_mask(df)
                                 & (df["Service Commitments"].astype(str).str.strip().replace({"nan": ""}) != "-"))
 
                     base_pool = df.loc[mask]
@@ -1461,6 +1445,15 @@ def run_generator(
                 total_base_rows = len(base_pool)
                 print(f"Processing {total_base_rows} base rows...")
                 start_time = time.time()
+                receiver_masks = {}  # Rows of base_pool naming each receiver, scanned once per sheet
+                support_groups_by_receiver = {}  # (support group, managed by group) pairs per receiver
+                # Receivers depend only on the country - other countries get both HS and DS
+                receivers = RECEIVERS_BY_COUNTRY.get(country, (f"HS {country}", f"DS {country}"))
+                # Country-specific schedule suffixes, resolved once per receiver
+                schedules_by_receiver = {
+                    recv: get_schedule_suffixes_for_country(country, recv, schedule_settings_per_country, schedule_suffixes)
+                    for recv in receivers
+                }
                 
                 for row_idx, (idx, base_row) in enumerate(base_pool.iterrows()):
                     if row_idx % 10 == 0 and row_idx > 0:
@@ -1469,27 +1462,9 @@ def run_generator(
                         remaining = (total_base_rows - row_idx) * avg_time
                         print(f"  Processed {row_idx}/{total_base_rows} base rows... ETA: {remaining:.1f}s")
                         
-                    base_row_df = base_row.to_frame().T.copy()
+                    base_row_values = base_row.to_dict()
                     tag_hs, tag_ds = f"HS {country}", f"DS {country}"
 
-                    # Define receivers ONLY ONCE based on country and context
-                    if country == "PL":
-                        receivers = ["HS PL", "DS PL"]
-                    elif country == "CY":
-                        receivers = ["DS CY"]  # CY now has only DS
-                    elif country == "DE":
-                        receivers = ["HS DE", "DS DE"]
-                    elif country == "UA":
-                        receivers = ["DS UA"]  # Only DS for UA
-                    elif country == "MD":
-                        receivers = ["DS MD"]  # Only DS for MD
-                    elif country == "RO":
-                        receivers = ["DS RO"]  # Only DS for RO
-                    elif country == "TR":
-                        receivers = ["DS TR"]  # Only DS for TR
-                    else:
-                        receivers = [f"HS {country}", f"DS {country}"]
-
                     parent_full = str(base_row["Parent Offering"])
                     
                     # Store original depend on value
@@ -1500,17 +1475,23 @@ def run_generator(
                         for recv in receivers:
                             # ADD THIS CHECK RIGHT HERE - Skip if receiver doesn't match any rows in base_pool
                             if not use_new_parent:
-                                recv_check = base_pool["Name (Child Service Offering lvl 1)"].str.contains(
-                                    rf"\b{re.escape(recv)}\b", case=False
-                                )
-                                if not recv_check.any():
+                                if recv not in receiver_masks:
+                                    receiver_masks[recv] = base_pool["Name (Child Service Offering lvl 1)"].str.contains(
+                                        receiver_word_re(recv)
+                                    )
+                                recv_mask = receiver_masks[recv]
+                                if not recv_mask.any():
                                     print(f"Skipping receiver {recv} - no matching entries in source data")
                                     continue  # Skip this receiver
                             
-                            # Get country-specific schedule suffixes
-                            country_schedule_suffixes = get_schedule_suffixes_for_country(
-                                country, recv, schedule_settings_per_country, schedule_suffixes
-                            )
+                            country_schedule_suffixes = schedules_by_receiver[recv]
+                            
+                            # For DE, base this receiver's rows on its matching row (DS DE or HS DE) in the original data -
+                            # the receiver check above guarantees there is one
+                            if country == "DE" and not use_new_parent and country_schedule_suffixes:
+                                base_row = base_pool[recv_mask].iloc[0]
+                                base_row_values = base_row.to_dict()
+                                original_depend_on = str(base_row.get("Service Offerings | Depend On (Application Service)", "")).strip()
                             
                             for schedule_suffix in country_schedule_suffixes:
                                 # Check if schedule exists in the source data
@@ -1521,24 +1502,16 @@ def run_generator(
                                     # Normalize schedule for comparison
                                     schedule_pattern = schedule_suffix.strip()
                                     
-                                    # Check if this schedule exists at the END of any offering name
-                                    schedule_found = any(name.strip().endswith(schedule_pattern) for name in all_country_names_for_schedules)
+                                    # Check if this schedule exists at the END of any offering name - once per schedule,
+                                    # in one vectorized pass over the (already stripped) names
+                                    if schedule_pattern not in schedule_found_by_suffix:
+                                        schedule_found_by_suffix[schedule_pattern] = bool(
+                                            all_country_names_for_schedules.str.endswith(schedule_pattern, na=False).any()
+                                        )
                                     
-                                    if not schedule_found:
+                                    if not schedule_found_by_suffix[schedule_pattern]:
                                         missing_schedule = True
                                 
-                                # For DE, find the matching row (DS DE or HS DE) in the original data
-                                if country == "DE" and not use_new_parent:
-                                    # Always attempt to pick matching row but do not skip if none found
-                                    recv_mask = base_pool["Name (Child Service Offering lvl 1)"].str.contains(
-                                        rf"\b{re.escape(recv)}\b", case=False
-                                    )
-                                    if recv_mask.any():
-                                        # Use the first matching row as base
-                                        base_row = base_pool[recv_mask].iloc[0]
-                                        base_row_df = base_row.to_frame().T.copy()
-                                        original_depend_on = str(base_row.get("Service Offerings | Depend On (Application Service)", "")).strip()
-                                
                                 # Build name based on type
                                 if is_lvl2:
                                     new_name = build_lvl2_name(
@@ -1587,45 +1560,49 @@ def run_generator(
                                         division = "DS"
                                     else:
                                         # Try to determine from parent offering
-                                        parent_content = extract_parent_info(parent_full)
-                                        if "HS" in parent_content.split():
+                                        parent_parts = extract_parent_info(parent_full).split()
+                                        if "HS" in parent_parts:
                                             division = "HS"
-                                        elif "DS" in parent_content.split():
+                                        elif "DS" in parent_parts:
                                             division = "DS"
                                         else:
                                             # Default to HS if cannot determine
                                             division = "HS"
                             
-                                # Get support groups list
-                                if country == "PL":
-                                    # For PL, directly use the receiver-specific support group
-                                    # The receiver is the key (e.g., "HS PL" or "DS PL")
-                                    key = recv  # recv is already correctly set to "HS PL" or "DS PL"
-                                    country_supports = support_groups_per_country.get(key, "")
-                                    country_managed = managed_by_groups_per_country.get(key, "")
+                                # Support groups depend only on the receiver here (division only matters
+                                # for PL, which is keyed by receiver) - worked out once per receiver and sheet
+                                if recv not in support_groups_by_receiver:
+                                    if country == "PL":
+                                        # For PL, directly use the receiver-specific support group
+                                        # The receiver is the key (e.g., "HS PL" or "DS PL")
+                                        key = recv  # recv is already correctly set to "HS PL" or "DS PL"
+                                        country_supports = support_groups_per_country.get(key, "")
+                                        country_managed = managed_by_groups_per_country.get(key, "")
                                     
-                                    # For PL, we expect only one support group per receiver
-                                    if country_supports:
-                                        sg = str(country_supports).strip()
-                                        mg = str(country_managed or sg).strip()
-                                        support_groups_list = [(sg, mg)]
+                                        # For PL, we expect only one support group per receiver
+                                        if country_supports:
+                                            sg = str(country_supports).strip()
+                                            mg = str(country_managed or sg).strip()
+                                            support_groups_list = [(sg, mg)]
+                                        else:
+                                            # Fallback to empty if no support group configured for this receiver
+                                            support_groups_list = [("", "")]
                                     else:
-                                        # Fallback to empty if no support group configured for this receiver
-                                        support_groups_list = [("", "")]
-                                else:
-                                    # For other countries, use the existing logic
-                                    support_groups_list = get_support_groups_list_for_country(
-                                        country, support_group, support_groups_per_country, 
-                                        managed_by_groups_per_country, division
-                                    )
+                                        # For other countries, use the existing logic
+                                        support_groups_list = get_support_groups_list_for_country(
+                                            country, support_group, support_groups_per_country, 
+                                            managed_by_groups_per_country, division
+                                        )
                                 
-                                # For DE, limit groups to those matching the current receiver if any, else keep all
-                                if country == "DE" and recv:
-                                    prefix = recv
-                                    matching = [(sg, mg) for sg, mg in support_groups_list
-                                                if sg.strip().startswith(prefix)]
-                                    if matching:
-                                        support_groups_list = matching
+                                    # For DE, limit groups to those matching the current receiver if any, else keep all
+                                    if country == "DE" and recv:
+                                        prefix = recv
+                                        matching = [(sg, mg) for sg, mg in support_groups_list
+                                                    if sg.strip().startswith(prefix)]
+                                        if matching:
+                                            support_groups_list = matching
+                                    support_groups_by_receiver[recv] = support_groups_list
+                                support_groups_list = support_groups_by_receiver[recv]
                                 
                                 # Create offerings for each support group combination
                                 for support_group_for_country, managed_by_group_for_country in support_groups_list:
@@ -1642,92 +1619,92 @@ def run_generator(
                                     if key in seen:
                                         continue
                                     seen.add(key)
-                                    row = base_row_df.copy()
+                                    row = base_row_values.copy()
                                     
                                     # Update the name
-                                    row.loc[:, "Name (Child Service Offering lvl 1)"] = new_name
+                                    row["Name (Child Service Offering lvl 1)"] = new_name
                                     
                                     # Handle Parent column properly
                                     if use_new_parent:
                                         # In new parent mode, base_row is synthetic and contains the new parent value
-                                        row.loc[:, "Parent"] = base_row.get("Parent", "")
+                                        row["Parent"] = base_row.get("Parent", "")
                                     # In standard mode, row is already a copy of base_row and contains the correct Parent value
 
-                                    row.loc[:, "Delivery Manager"] = delivery_manager
+                                    row["Delivery Manager"] = delivery_manager
                                     
                                     # Apply business criticality if provided
                                     if business_criticality:
-                                        row.loc[:, "Business Criticality"] = business_criticality
+                                        row["Business Criticality"] = business_criticality
                                     else:
                                         # Copy from original file if business criticality not provided
                                         if not use_new_parent:
                                             # Copy original value from source file
                                             original_bc = str(base_row.get("Business Criticality", "")).strip()
                                             if original_bc and original_bc not in ["nan", "NaN", "", "None"]:
-                                                row.loc[:, "Business Criticality"] = original_bc
+                                                row["Business Criticality"] = original_bc
                                             else:
-                                                row.loc[:, "Business Criticality"] = ""
+                                                row["Business Criticality"] = ""
                                         else:
                                             # For new parent mode, leave empty if not specified
-                                            row.loc[:, "Business Criticality"] = ""
+                                            row["Business Criticality"] = ""
                                     
                                     # Set Record view based on SR/IM selection
                                     if sr_or_im == "SR":
-                                        row.loc[:, "Record view"] = "Request Item"
+                                        row["Record view"] = "Request Item"
                                     elif sr_or_im == "IM":
-                                        row.loc[:, "Record view"] = "Incident, Major Incident"
+                                        row["Record view"] = "Incident, Major Incident"
                                     
                                     # Set Approval required with conditional value
                                     if approval_required:
-                                        row.loc[:, "Approval required"] = "true"  # Always use "true" when checkbox is ticked
+                                        row["Approval required"] = "true"  # Always use "true" when checkbox is ticked
                                         
                                         # Use per-app approval group if configured, otherwise use global value
                                         if approval_groups_per_app and app in approval_groups_per_app:
                                             app_approval_group = approval_groups_per_app[app].strip()
                                             # Keep empty if the user left it empty - don't force to "empty"
-                                            row.loc[:, "Approval group"] = app_approval_group
+                                            row["Approval group"] = app_approval_group
                                         else:
                                             # If no per-app configuration exists, use global value (but not "PER_APP")
                                             if approval_required_value and approval_required_value != "PER_APP":
-                                                row.loc[:, "Approval group"] = approval_required_value
+                                                row["Approval group"] = approval_required_value
                                             else:
                                                 # Keep empty instead of forcing "empty"
-                                                row.loc[:, "Approval group"] = ""
+                                                row["Approval group"] = ""
                                     else:
-                                        row.loc[:, "Approval required"] = "false"
-                                        row.loc[:, "Approval group"] = "empty"  # Use literal "empty" when not required
+                                        row["Approval required"] = "false"
+                                        row["Approval group"] = "empty"  # Use literal "empty" when not required
                                     
                                     # Set Subscribed by Location based on user choice or original value
                                     if change_subscribed_location:
-                                        row.loc[:, "Subscribed by Location"] = custom_subscribed_location
+                                        row["Subscribed by Location"] = custom_subscribed_location
                                     elif not use_new_parent:
                                         # Copy from original file if not using new parent
-                                        row.loc[:, "Subscribed by Location"] = base_row.get("Subscribed by Location", "")
+                                        row["Subscribed by Location"] = base_row.get("Subscribed by Location", "")
                                     else:
                                         # Default to "Global" if synthetic row
-                                        row.loc[:, "Subscribed by Location"] = "Global"
+                                        row["Subscribed by Location"] = "Global"
                                     
                                     # Apply support group and managed by group
-                                    row.loc[:, "Support group"] = support_group_for_country if support_group_for_country else ""
-                                    row.loc[:, "Managed by Group"] = managed_by_group_for_country if managed_by_group_for_country else ""
+                                    row["Support group"] = support_group_for_country if support_group_for_country else ""
+                                    row["Managed by Group"] = managed_by_group_for_country if managed_by_group_for_country else ""
                                     
                                     # Handle aliases
                                     exact_column_name = "Aliases (u_label) - ENG"
-                                    if exact_column_name not in row.columns:
+                                    if exact_column_name not in row:
                                         row[exact_column_name] = ""
                                     if aliases_on and aliases_value == "USE_APP_NAMES":
-                                        row.loc[:, exact_column_name] = app if app else ""
+                                        row[exact_column_name] = app if app else ""
                                     else:
                                         # Copy from original file
-                                        row.loc[:, exact_column_name] = base_row.get(exact_column_name, "")
+                                        row[exact_column_name] = base_row.get(exact_column_name, "")
                                     
                                     # Handle DE special cases
                                     if country == "DE":
-                                        ldap_cols = [col for col in row.columns if "LDAP" in col.upper() or "Ldap" in col or "ldap" in col]
+                                        ldap_cols = [col for col in row if "LDAP" in col.upper() or "Ldap" in col or "ldap" in col]
                                         if ldap_cols:
                                             # Clear all LDAP columns first
                                             for ldap_col in ldap_cols:
-                                                row.loc[:, ldap_col] = ""
+                                                row[ldap_col] = ""
 
                                     # Handle Subscribed by Company based on type and mode
                                     if use_new_parent:
@@ -1735,45 +1712,45 @@ def run_generator(
                                         if require_corp or require_recp or require_corp_it or require_corp_dedicated:
                                             # For CORP offerings, extract what comes after CORP
                                             # Example: [SR DS CY CORP HS DE Dedicated Services] -> "HS DE"
-                                            match = re.search(r'\[.*?CORP\s+([A-Z]{2}\s+[A-Z]{2})', new_name)
+                                            match = CORP_RECEIVER_RE.search(new_name)
                                             if match:
-                                                row.loc[:, "Subscribed by Company"] = match.group(1)
+                                                row["Subscribed by Company"] = match.group(1)
                                             else:
                                                 # Fallback to receiver if pattern not found
-                                                row.loc[:, "Subscribed by Company"] = recv
+                                                row["Subscribed by Company"] = recv
                                         else:
                                             # For non-CORP in new parent mode, use receiver (e.g., "HS PL", "DS PL")
-                                            row.loc[:, "Subscribed by Company"] = recv
+                                            row["Subscribed by Company"] = recv
                                     elif country == "DE":
                                         # Existing DE logic for Germany
                                         company, _ = get_de_company_and_ldap(support_group_for_country, recv, base_row)
-                                        row.loc[:, "Subscribed by Company"] = company
+                                        row["Subscribed by Company"] = company
                                     elif require_corp or require_recp or require_corp_it or require_corp_dedicated:
                                         # For CORP offerings in normal mode, clear the field
-                                        row.loc[:, "Subscribed by Company"] = ""
+                                        row["Subscribed by Company"] = ""
                                     # For standard offerings, keep original value from source file
                                     
-                                    orig_comm = str(row.iloc[0]["Service Commitments"]).strip()
+                                    orig_comm = str(row["Service Commitments"]).strip()
                                     
                                     # If schedule is missing, use original commitments with user schedule
                                     if missing_schedule:
                                         if not orig_comm or orig_comm in ["-", "nan", "NaN", "", None]:
                                             # If original commitments are empty, create new ones with user schedule
-                                            row.loc[:, "Service Commitments"] = commit_block(country, schedule_suffix, rsp_duration, rsl_duration, sr_or_im)
+                                            row["Service Commitments"] = commit_block(country, schedule_suffix, rsp_duration, rsl_duration, sr_or_im)
                                         else:
                                             # Update original commitments with user schedule
-                                            row.loc[:, "Service Commitments"] = update_commitments(orig_comm, schedule_suffix, rsp_duration, rsl_duration, sr_or_im, country)
+                                            row["Service Commitments"] = update_commitments(orig_comm, schedule_suffix, rsp_duration, rsl_duration, sr_or_im, country)
                                     # For Lvl2, keep empty commitments empty
                                     elif is_lvl2 and (not orig_comm or orig_comm in ["-", "nan", "NaN", "", None]):
-                                        row.loc[:, "Service Commitments"] = ""
+                                        row["Service Commitments"] = ""
                                     else:
                                         # Handle custom commitments - use both approaches
                                         if use_custom_commitments and custom_commitments_str:
                                             # Use the direct string if provided
-                                            row.loc[:, "Service Commitments"] = custom_commitments_str
+                                            row["Service Commitments"] = custom_commitments_str
                                         elif use_custom_commitments and commitment_country:
                                             # Use custom_commit_block function if country provided
-                                            row.loc[:, "Service Commitments"] = custom_commit_block(
+                                            row["Service Commitments"] = custom_commit_block(
                                                 commitment_country,
                                                 sr_or_im, rsp_enabled, rsl_enabled,
                                                 rsp_schedule, rsl_schedule, rsp_priority, rsl_priority,
@@ -1782,9 +1759,9 @@ def run_generator(
                                         else:
                                             # Use existing logic
                                             if not orig_comm or orig_comm == "-":
-                                                row.loc[:, "Service Commitments"] = commit_block(country, schedule_suffix, rsp_duration, rsl_duration, sr_or_im)
+                                                row["Service Commitments"] = commit_block(country, schedule_suffix, rsp_duration, rsl_duration, sr_or_im)
                                             else:
-                                                row.loc[:, "Service Commitments"] = update_commitments(orig_comm, schedule_suffix, rsp_duration, rsl_duration, sr_or_im, country)
+                                                row["Service Commitments"] = update_commitments(orig_comm, schedule_suffix, rsp_duration, rsl_duration, sr_or_im, country)
                                     
                                     # Special handling for IT with UA/MD/RO/TR - always use DS
                                     if (special_dept == "IT" or require_corp_it) and country in ["UA", "MD", "RO", "TR"]:
@@ -1794,9 +1771,9 @@ def run_generator(
                                     else:
                                         if country == "PL":
                                             # Regex-based PL Prod determination (case-insensitive)
-                                            if re.search(r'\bHS\s+PL\b', new_name, re.IGNORECASE):
+                                            if HS_PL_RE.search(new_name):
                                                 depend_tag = "HS PL Prod"
-                                            elif re.search(r'\bDS\s+PL\b', new_name, re.IGNORECASE):
+                                            elif DS_PL_RE.search(new_name):
                                                 depend_tag = "DS PL Prod"
                                             else:
                                                 depend_tag = "DS PL Prod"  # safe default
@@ -1815,17 +1792,17 @@ def run_generator(
                                             if global_prod:
                                                 # Replace the closing ] with Prod]
                                                 prefix_with_prod = custom_depend_on_value.replace(']', ' Prod]')
-                                                row.loc[:, "Service Offerings | Depend On (Application Service)"] = f"{prefix_with_prod} {app_to_use}"
+                                                row["Service Offerings | Depend On (Application Service)"] = f"{prefix_with_prod} {app_to_use}"
                                             else:
-                                                row.loc[:, "Service Offerings | Depend On (Application Service)"] = f"{custom_depend_on_value} {app_to_use}"
+                                                row["Service Offerings | Depend On (Application Service)"] = f"{custom_depend_on_value} {app_to_use}"
                                         else:
                                             # If no app, use just the prefix
                                             if global_prod:
                                                 # Replace the closing ] with Prod]
                                                 prefix_with_prod = custom_depend_on_value.replace(']', ' Prod]')
-                                                row.loc[:, "Service Offerings | Depend On (Application Service)"] = prefix_with_prod
+                                                row["Service Offerings | Depend On (Application Service)"] = prefix_with_prod
                                             else:
-                                                row.loc[:, "Service Offerings | Depend On (Application Service)"] = custom_depend_on_value
+                                                row["Service Offerings | Depend On (Application Service)"] = custom_depend_on_value
                                     else:
                                         # Custom depend on is NOT enabled - preserve bracket content, replace the rest
                                         if original_depend_on and original_depend_on not in ["nan", "NaN", "", "None"]:
@@ -1837,16 +1814,16 @@ def run_generator(
                                                 if ']' in original_depend_on:
                                                     bracket_end = original_depend_on.index(']') + 1
                                                     bracket_part = original_depend_on[:bracket_end]
-                                                    row.loc[:, "Service Offerings | Depend On (Application Service)"] = f"{bracket_part} {app_to_use}"
+                                                    row["Service Offerings | Depend On (Application Service)"] = f"{bracket_part} {app_to_use}"
                                                 else:
                                                     # No bracket found, just use the app
-                                                    row.loc[:, "Service Offerings | Depend On (Application Service)"] = app_to_use
+                                                    row["Service Offerings | Depend On (Application Service)"] = app_to_use
                                             else:
                                                 # No app specified, keep original value
-                                                row.loc[:, "Service Offerings | Depend On (Application Service)"] = original_depend_on
+                                                row["Service Offerings | Depend On (Application Service)"] = original_depend_on
                                         else:
                                             # No original value found, leave empty
-                                            row.loc[:, "Service Offerings | Depend On (Application Service)"] = ""
+                                            row["Service Offerings | Depend On (Application Service)"] = ""
                                     
                                     # Create sheet key with level distinction
                                     sheet_key = f"{country} lvl{current_level}"
@@ -1856,26 +1833,22 @@ def run_generator(
                                     
                                     # Accumulate rows in lists for batch concatenation
                                     sheets_data.setdefault(sheet_key, [])
-                                    if isinstance(row, pd.DataFrame):
-                                        row_dict = row.iloc[0].to_dict()
-                                    else:
-                                        row_dict = row.to_dict()
                                     
                                     # Add missing schedule flag to the row dictionary
                                     if missing_schedule:
-                                        row_dict["_missing_schedule"] = True
+                                        row["_missing_schedule"] = True
                                     else:
-                                        row_dict["_missing_schedule"] = False
+                                        row["_missing_schedule"] = False
                                     
                                     # Store the column order key for this sheet
-                                    row_dict["_column_order_key"] = column_key
+                                    row["_column_order_key"] = column_key
                                     
-                                    sheets_data[sheet_key].append(row_dict)
+                                    sheets_data[sheet_key].append(row)
                                 
             except Exception as e:
                 # Skip if sheet doesn't exist or other error
                 if "Worksheet" not in str(e):  # Only skip worksheet not found errors silently
-                    print(f"Error processing {sheet_name} in {wb}: {e}")
+                    print(f"Error processing {sheet_name} in {file_stem}: {e}")
                 continue
 
     print(f"Starting main processing with {len(sheets_data)} potential sheets...")
@@ -1887,11 +1860,16 @@ def run_generator(
     # Convert lists to DataFrames once - major performance improvement!
     print(f"Converting {len(sheets_data)} sheet lists to DataFrames...")
     
-    # Create output file path
-    outfile = out_dir / f"Generated_Service_Offerings_{dt.datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+    # Create output file path - without out_dir the workbook is built in memory
+    file_name = f"Generated_Service_Offerings_{dt.datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+    if out_dir is None:
+        outfile = io.BytesIO()
+        outfile.name = file_name
+    else:
+        outfile = out_dir / file_name
 
-    # Ensure output directory exists
-    out_dir.mkdir(parents=True, exist_ok=True)
+        # Ensure output directory exists
+        out_dir.mkdir(parents=True, exist_ok=True)
 
     # Check if we have any data to write
     if not sheets_data or all(not rows_list for rows_list in sheets_data.values()):
@@ -1908,202 +1886,101 @@ def run_generator(
         # Return None or raise an exception instead of trying to create empty Excel
         raise ValueError("No matching offerings found. Please adjust your search criteria.")
 
-    # Write to Excel with special handling for empty values
-    with pd.ExcelWriter(outfile, engine="openpyxl") as w:
-        sheets = {}  # Store final DataFrames for later use
-        
-        for sheet_key, rows_list in sheets_data.items():
-            if rows_list:
-                print(f"  Processing {sheet_key}: {len(rows_list)} rows")
-                df = pd.DataFrame(rows_list)
-                
-                # Get the column order key from the first row
-                column_order_key = None
-                if "_column_order_key" in df.columns and len(df) > 0:
-                    column_order_key = df.iloc[0]["_column_order_key"]
-
-                # Extract sheet_name from sheet_key for use below
-                sheet_name = sheet_key
-
-                # Track which rows have missing schedules BEFORE dropping the column
-                missing_schedule_rows = []
-                if "_missing_schedule" in df.columns:
-                    missing_schedule_rows = df[df["_missing_schedule"] == True].index.tolist()
-                    # Store this info for later use
-                    missing_schedule_info[sheet_name] = missing_schedule_rows
-                
-                # Remove helper columns
-                for col in ["_missing_schedule", "_column_order_key"]:
-                    if col in df.columns:
-                        df = df.drop(columns=[col])
-                
-                # Reorder columns to match original order if we have it
-                if column_order_key and column_order_key in column_order_cache:
-                    original_order = column_order_cache[column_order_key]
-                    
-                    # Get the original DataFrame to preserve missing column values
-                    original_df = None
-                    if not use_new_parent:
-                        # Try to get the original data for this sheet
-                        country = sheet_key.split()[0]
-                        level = sheet_key.split()[1]  # e.g., "lvl1"
-                        sheet_name_lookup = f"Child SO {level}"
-                        
-                        # Find the source file for this country
-                        for wb_path in src_dir.glob(f"ALL_Service_Offering_*{country}.xlsx"):
-                            try:
-                                if wb_path in excel_cache:
-                                    excel_file = excel_cache[wb_path]
-                                    if sheet_name_lookup in excel_file.sheet_names:
-                                        original_df = pd.read_excel(excel_file, sheet_name=sheet_name_lookup)
-                                        break
-                            except Exception:
-                                continue
-                    
-                    # Add missing columns from original, preserving their values - SAFER VERSION
-                    for col in original_order:
-                        if col not in df.columns:
-                                df[col] = ''
-                    
-                    # Reorder columns to match original order, excluding Number column
-                    ordered_cols = []
-                    for col in original_order:
-                        if col in df.columns and col != "Number":
-                            ordered_cols.append(col)
-                    
-                    # Add any new columns that weren't in original
-                    new_cols = [col for col in df.columns if col not in original_order]
-                    
-                    # Reorder DataFrame
-                    df = df[ordered_cols + new_cols]
-                
-                # Extract country code from sheet_key (e.g., "PL lvl1" -> "PL")
-                cc = sheet_key.split()[0]
-                
-                # Clean data before writing to Excel - SAFER VERSION
-                df_final = df.copy()
-                
-                # Clean cell values safely
-                def _clean_cell(x):
-                    """
-                    Normalise cell values before saving to Excel.
-                    Turns NaNs/None/NULL-like tokens into empty strings.
-                    Leaves everything else untouched (but stripped).
-                    """
-                    if pd.isna(x):
-                        return ''
-                    s = str(x).strip()
-                    if s.lower() in {'nan', 'none', 'null', '<na>', 'n/a'}:
-                        return ''
-                    return s
-
-                # Use _clean_cell directly with applymap for DataFrame, apply for Series
-                if isinstance(df_final, pd.DataFrame):
-                    df_final = df_final.map(_clean_cell)
-                elif isinstance(df_final, pd.Series):
-                    df_final = df_final.apply(_clean_cell)
-
-                # Keep the dedicated treatment for the two boolean-ish columns
-                df_final["Approval required"] = df_final["Approval required"].apply(clean_approval_value)
-
-                def _clean_approval_group(v):
-                    v = _clean_cell(v)
-                    return v  # Just return the cleaned value without forcing "empty"
-
-                if "Approval group" in df_final.columns:
-                    df_final["Approval group"] = df_final["Approval group"].apply(_clean_approval_group)
-                
-                # Store the final DataFrame for later formatting use
-                sheets[sheet_key] = df_final
-                
-                # Write to Excel
-                df_final.to_excel(w, sheet_name=sheet_key, index=False)
+    # Build the final sheets with special handling for empty values
+    sheets = {}  # Store final DataFrames for later use
     
-    # Apply formatting with red highlighting for missing schedules
-    try:
-        wb = load_workbook(outfile)
-        red_fill = PatternFill(start_color="FFCCCC", end_color="FFCCCC", fill_type="solid")
-        
-        for ws in wb.worksheets:
-            sheet_name = ws.title
-
-            # Find the column index for "Name (Child Service Offering lvl 1)"
-            name_col_idx = None
-            for idx, cell in enumerate(ws[1], start=1):
-                if cell.value == "Name (Child Service Offering lvl 1)":
-                    name_col_idx = idx
-                    break
-            if name_col_idx is not None:
-                name_col_letter = get_column_letter(name_col_idx)
-
-                # Apply red formatting to each row with missing schedule
-                for row_idx in missing_schedule_info.get(sheet_name, []):
-                    # Excel rows are 1-based, and we need to account for header
-                    excel_row_idx = row_idx + 2
-
-                    # Check if row exists
-                    if excel_row_idx <= ws.max_row:
-                        cell = ws[f"{name_col_letter}{excel_row_idx}"]
-                        cell.fill = red_fill
-
-                        # Optionally, add a comment explaining why it's red (removed undefined variables)
-                        # cell.comment = Comment(
-                        #     "Schedule not found in source data for this offering",
-                        #     "Service Offering Generator"
-                        # )
+    for sheet_key, rows_list in sheets_data.items():
+        if rows_list:
+            print(f"  Processing {sheet_key}: {len(rows_list)} rows")
+            df = pd.DataFrame(rows_list)
+            
+            # Get the column order key from the first row
+            column_order_key = None
+            if "_column_order_key" in df.columns and len(df) > 0:
+                column_order_key = df.iloc[0]["_column_order_key"]
+
+            # Extract sheet_name from sheet_key for use below
+            sheet_name = sheet_key
+
+            # Track which rows have missing schedules BEFORE dropping the column
+            missing_schedule_rows = []
+            if "_missing_schedule" in df.columns:
+                missing_schedule_rows = df[df["_missing_schedule"] == True].index.tolist()
+                # Store this info for later use
+                missing_schedule_info[sheet_name] = missing_schedule_rows
             
-            # Apply column widths and formatting
-            for col_idx, col in enumerate(ws.columns, start=1):
-                col_letter = get_column_letter(col_idx)
+            # Remove helper columns
+            for col in ["_missing_schedule", "_column_order_key"]:
+                if col in df.columns:
+                    df = df.drop(columns=[col])
+            
+            # Reorder columns to match original order if we have it
+            if column_order_key and column_order_key in column_order_cache:
+                original_order = column_order_cache[column_order_key]
                 
-                # Calculate column width more safely
-                max_length = 10  # minimum width
-                for cell in col:
-                    try:
-                        cell_length = len(str(cell.value)) if cell.value else 0
-                        if cell_length > max_length:
-                          max_length = min(cell_length, 100)  # cap at 100 to prevent issues
-                    except:
-                        pass
+                # Add missing columns from original, preserving their values - SAFER VERSION
+                for col in original_order:
+                    if col not in df.columns:
+                            df[col] = ''
                 
-                ws.column_dimensions[col_letter].width = max_length + 2
+                # Reorder columns to match original order, excluding Number column
+                ordered_cols = []
+                for col in original_order:
+                    if col in df.columns and col != "Number":
+                        ordered_cols.append(col)
                 
-                # Apply text wrapping and clean cell values - SAFER VERSION
-                for cell in col:
-                    try:
-                        if hasattr(cell, 'alignment'):
-                            cell.alignment = Alignment(wrap_text=True)
-                        
-                        # Clean up cell values more safely
-                        from openpyxl.cell.cell import MergedCell
-                        if not isinstance(cell, MergedCell) and hasattr(cell, 'value') and cell.value is not None:
-                            cell_val = str(cell.value).strip()
-                            # Only clean up obviously invalid values
-                            if cell_val.lower() in ['nan', 'none', 'null', '<na>', 'n/a'] or cell_val == '':
-                                cell.value = None  # Use None instead of empty string for Excel
-                            # Keep other values as-is to avoid corruption
-                    except Exception as e:
-                        # Don't print warnings for every cell - just continue
-                        continue
-        
-        wb.save(outfile)
-    except Exception as e:
-        print(f"Warning: Error applying formatting: {e}")
-        # If formatting fails, the file should still be valid without formatting
-    
-    # Clean up Excel cache to free memory
-    for excel_file in excel_cache.values():
-        try:
-            if isinstance(excel_file, pd.ExcelFile):
-                excel_file.close()
-        except:
-            pass
+                # Add any new columns that weren't in original
+                new_cols = [col for col in df.columns if col not in original_order]
+                
+                # Reorder DataFrame
+                df = df[ordered_cols + new_cols]
+            
+            # Extract country code from sheet_key (e.g., "PL lvl1" -> "PL")
+            cc = sheet_key.split()[0]
+            
+            # Clean data before writing to Excel - SAFER VERSION
+            df_final = df.copy()
+            
+            # Clean cell values safely
+            def _clean_cell(x):
+                """
+                Normalise cell values before saving to Excel.
+                Turns NaNs/None/NULL-like tokens into empty strings.
+                Leaves everything else untouched (but stripped).
+                """
+                if pd.isna(x):
+                    return ''
+                s = str(x).strip()
+                if s.lower() in {'nan', 'none', 'null', '<na>', 'n/a'}:
+                    return ''
+                return s
+
+            # Use _clean_cell directly with applymap for DataFrame, apply for Series
+            if isinstance(df_final, pd.DataFrame):
+                df_final = df_final.map(_clean_cell)
+            elif isinstance(df_final, pd.Series):
+                df_final = df_final.apply(_clean_cell)
+
+            # Keep the dedicated treatment for the two boolean-ish columns
+            df_final["Approval required"] = df_final["Approval required"].apply(clean_approval_value)
+
+            def _clean_approval_group(v):
+                v = _clean_cell(v)
+                return v  # Just return the cleaned value without forcing "empty"
+
+            if "Approval group" in df_final.columns:
+                df_final["Approval group"] = df_final["Approval group"].apply(_clean_approval_group)
+            
+            # Store the final DataFrame for later formatting use
+            sheets[sheet_key] = df_final
+
+    write_output_workbook(outfile, sheets, missing_schedule_info)
 
-    print("Processing complete. Output saved to:", outfile)
+    print("Processing complete. Output saved to:", file_name if out_dir is None else outfile)
     
     # Ensure the file exists before returning
-    if not outfile.exists():
+    if out_dir is not None and not outfile.exists():
         raise FileNotFoundError(f"Generated file not found: {outfile}")
     
-    # Return the output file path as Path object
+    # Return the output file path as Path object, or the in-memory workbook (named BytesIO)
     return outfile
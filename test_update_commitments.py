@@ -0,0 +1,28 @@
+from generator_core import update_commitments
+
+def test_update_commitments():
+    orig = "\n".join([
+        "[SR PL] RSP Mon-Fri 8-16 P1-P4 8h",
+        " [SR PL] RSL Mon-Fri 8-16 P1-P2 2d",
+        "",
+        "[SR PL] OLA RSL Mon-Fri 8-16 P3-P4 5d",
+        "[SR PL] OLA Mon-Fri 8-16 P1-P4 3d",
+        "Other line",
+    ])
+    result = update_commitments(orig, "Mon-Sun 24/7", "4h", "1d", "SR", "PL").split("\n")
+    print(f"Updated commitments: {result}")
+    # RSP: schedule and RSP duration replaced, priorities kept
+    assert result[0] == "[SR PL] RSP Mon-Sun 24/7 P1-P4 4h"
+    # RSL: stripped, schedule and RSL duration replaced, empty lines dropped
+    assert result[1] == "[SR PL] RSL Mon-Sun 24/7 P1-P2 1d"
+    # OLA lines get the RSL duration, the schedule only where the line names RSL
+    assert result[2] == "[SR PL] OLA RSL Mon-Sun 24/7 P3-P4 1d"
+    assert result[3] == "[SR PL] OLA Mon-Fri 8-16 P1-P4 1d"
+    # Other lines pass through unchanged
+    assert result[4] == "Other line"
+    assert len(result) == 5
+
+    print("All tests passed!")
+
+if __name__ == "__main__":
+    test_update_commitments()